@@ -0,0 +1,293 @@
+"""
+Benchmark for matrix module.
+Run with `python benchmark.py [det] [matmul] [suite]`.
+
+`suite` measures every operation over sizes, value distributions and dtypes.
+Use `--json FILE` to save its results, and `--compare FILE` to compare
+them with saved ones. See `python benchmark.py --help`.
+Memory is reported as peak bytes traced by tracemalloc, and as number of
+blocks still allocated after the operation. Python does not count every
+allocation made, so that number is not given.
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from fractions import Fraction
+
+from matrix import Matrix
+
+
+def random_matrix(row, col, low=-9, high=9, seed=0):
+    rand = random.Random(seed)
+    return Matrix([[rand.randint(low, high) for _ in range(col)]
+                   for _ in range(row)])
+
+
+def timeit(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def bench_det(args=None):
+    print("==Determinant (bareiss)==")
+    print("{:>5} {:>12}".format("n", "seconds"))
+    for size in (8, 16, 32, 50, 75, 100, 150, 200):
+        mat = random_matrix(size, size, seed=size)
+        print("{:>5} {:>12.5f}".format(size, timeit(mat.determinant)))
+
+    print("==Determinant (modular)==")
+    print("{:>5} {:>12} {:>12}".format("n", "seconds", "is_singular"))
+    for size in (8, 16, 32, 50, 75, 100):
+        mat = random_matrix(size, size, seed=size)
+        print("{:>5} {:>12.5f} {:>12.5f}".format(
+            size, timeit(mat.determinant, method='modular'),
+            timeit(mat.is_singular)))
+
+    print("==Determinant (cofactor)==")
+    print("{:>5} {:>12}".format("n", "seconds"))
+    for size in (6, 7, 8):
+        mat = random_matrix(size, size, seed=size)
+        print("{:>5} {:>12.5f}".format(
+            size, timeit(mat.determinant, method='cofactor')))
+
+
+def legacy_matmul(a, b):
+    """
+    2D matrix multiply as it was done before the blocked kernel.
+    """
+    a, b = Matrix(a[:]), Matrix(b[:])
+    b = b.T
+    return Matrix([[sum([i[n] * j[n] for n in range(len(i))])
+                    for j in b] for i in a])
+
+
+def bench_matmul(args=None):
+    print("==Matrix multiply==")
+    print("{:>5} {:>12} {:>12} {:>12}".format(
+        "n", "legacy", "blocked", "strassen"))
+    for size in (50, 100, 300):
+        a = random_matrix(size, size, seed=size)
+        b = random_matrix(size, size, seed=size + 1)
+        legacy = timeit(legacy_matmul, a, b)
+        blocked = timeit(a.__matmul__, b)
+        Matrix.strassen_threshold = 64
+        strassen = timeit(a.__matmul__, b)
+        Matrix.strassen_threshold = None
+        print("{:>5} {:>12.5f} {:>12.5f} {:>12.5f}".format(
+            size, legacy, blocked, strassen))
+
+
+DISTRIBUTIONS = {
+    'small': lambda rand: rand.randint(-9, 9),
+    'large': lambda rand: rand.randint(-10**30, 10**30),
+    'fraction': lambda rand: Fraction(rand.randint(-99, 99),
+                                      rand.randint(1, 99)),
+    'sparse': lambda rand: rand.randint(-9, 9) if rand.random() < 0.1 else 0,
+}
+
+DTYPES = ('fraction', 'int', 'float')
+
+# Values of distribution cannot be stored in dtype.
+SKIPPED = {('fraction', 'int')}
+
+OPERATIONS = {
+    'matmul': ((10, 30, 60), lambda a, b: a @ b),
+    'det': ((10, 30, 60), lambda a, b: a.det),
+    'gauss_elim': ((10, 30, 60), lambda a, b: a.gauss_elim(b)),
+    'inv_using_det': ((4, 8, 12), lambda a, b: a.inv_using_det()),
+    'cramer': ((10, 30, 60), lambda a, b: a.cramer(tuple(b.T[0]))),
+    'str': ((10, 60, 150), lambda a, b: str(a)),
+}
+
+
+def distributed_matrix(dist, row, col, seed, dtype='fraction'):
+    """
+    Matrix of `dtype` with elements from `DISTRIBUTIONS[dist]`.
+    Same arguments always give same matrix.
+    Diagonal of sparse matrix is nonzero, so it has inverse in most cases.
+    """
+    rand = random.Random('{}-{}'.format(dist, seed))
+    element = DISTRIBUTIONS[dist]
+    rows = [[element(rand) for _ in range(col)] for _ in range(row)]
+    if dist == 'sparse':
+        for i in range(min(row, col)):
+            rows[i][i] = rand.randint(1, 9)
+    return Matrix(rows, dtype)
+
+
+def measure(func, a, b, repeat):
+    """
+    Measure `func(a, b)`. Every run gets fresh copy of `a`,
+    so factorization cached in it is not reused.
+
+    Returns best wall time of `repeat` runs, peak of memory traced by
+    tracemalloc in one more run, and number of memory blocks still
+    allocated after another run without tracemalloc, which are mostly
+    the result.
+    """
+    best = None
+    for _ in range(repeat):
+        mat = a.copy()
+        start = time.perf_counter()
+        func(mat, b)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    mat = a.copy()
+    tracemalloc.start()
+    result = func(mat, b)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del mat, result
+
+    mat = a.copy()
+    gc.collect()
+    retained_blocks = sys.getallocatedblocks()
+    result = func(mat, b)
+    gc.collect()
+    retained_blocks = sys.getallocatedblocks() - retained_blocks
+    del result
+    return best, peak, retained_blocks
+
+
+def run_suite(ops=None, dists=None, dtypes=None, quick=False, repeat=3):
+    """
+    Measure every operation for every distribution, dtype and size.
+    Returns list of records, which can be saved as JSON.
+    """
+    records = []
+    for op in ops or OPERATIONS:
+        sizes, func = OPERATIONS[op]
+        if quick:
+            sizes = sizes[:2]
+        for dist in dists or DISTRIBUTIONS:
+            for dtype in dtypes or DTYPES:
+                if (dist, dtype) in SKIPPED:
+                    continue
+                for size in sizes:
+                    records.append(run_case(func, op, dist, dtype, size,
+                                            repeat))
+                    print_record(records[-1])
+    return records
+
+
+def run_case(func, op, dist, dtype, size, repeat):
+    a = distributed_matrix(dist, size, size, size, dtype)
+    b = distributed_matrix(dist, size, 1, size + 1, dtype)
+    record = {'op': op, 'dist': dist, 'dtype': dtype, 'n': size}
+    try:
+        seconds, peak, retained_blocks = measure(func, a, b, repeat)
+    except ZeroDivisionError as e:
+        record['error'] = str(e)
+    else:
+        record.update(seconds=seconds, peak_bytes=peak,
+                      retained_blocks=retained_blocks)
+    return record
+
+
+def record_key(record):
+    """
+    Key of case measured by record. Records saved before dtype was
+    measured are of 'fraction' dtype.
+    """
+    return (record['op'], record['dist'], record.get('dtype', 'fraction'),
+            record['n'])
+
+
+def print_record(record, baseline=None, threshold=None):
+    line = "{op:>14} {dist:>9} {dtype:>9} {n:>5} ".format(**record)
+    if 'error' in record:
+        print(line + record['error'])
+        return
+    line += "{seconds:>11.5f} {peak_bytes:>12} {retained_blocks:>15}"\
+        .format(**record)
+    if baseline and 'seconds' in baseline:
+        ratio = record['seconds'] / max(baseline['seconds'], 1e-9)
+        line += " {:>11.5f} {:>6.2f}x".format(baseline['seconds'], ratio)
+        if ratio > threshold:
+            line += " SLOWER"
+        elif ratio < 1 / threshold:
+            line += " faster"
+    print(line)
+
+
+def compare(records, baseline_records, threshold):
+    """
+    Print records next to saved baseline.
+    Returns number of records slower than `threshold` times baseline.
+    """
+    baseline = {record_key(x): x for x in baseline_records}
+    print("==Compared with baseline==")
+    print("{:>14} {:>9} {:>9} {:>5} {:>11} {:>12} {:>15} {:>11} {:>7}"
+          .format("op", "dist", "dtype", "n", "seconds", "peak_bytes",
+                  "retained_blocks", "baseline", "ratio"))
+    slower = 0
+    for record in records:
+        base = baseline.get(record_key(record))
+        print_record(record, base, threshold)
+        if base and 'seconds' in base and 'seconds' in record\
+                and record['seconds'] > threshold * base['seconds']:
+            slower += 1
+    return slower
+
+
+def bench_suite(args):
+    print("==Suite==")
+    print("{:>14} {:>9} {:>9} {:>5} {:>11} {:>12} {:>15}".format(
+        "op", "dist", "dtype", "n", "seconds", "peak_bytes",
+        "retained_blocks"))
+    records = run_suite(args.ops, args.dists, args.dtypes, args.quick,
+                        args.repeat)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version, 'records': records}, f,
+                      indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['records']
+        return compare(records, baseline, args.threshold)
+    return 0
+
+
+BENCHMARKS = {'det': bench_det, 'matmul': bench_matmul, 'suite': bench_suite}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark matrix module.")
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help="benchmarks to run, from {}. All if not given."
+                        .format(', '.join(BENCHMARKS)))
+    parser.add_argument('--ops', nargs='+', choices=list(OPERATIONS),
+                        help="operations measured by suite")
+    parser.add_argument('--dists', nargs='+', choices=list(DISTRIBUTIONS),
+                        help="value distributions used by suite")
+    parser.add_argument('--dtypes', nargs='+', choices=DTYPES,
+                        help="dtypes of matrixes used by suite")
+    parser.add_argument('--quick', action='store_true',
+                        help="use only two smallest sizes in suite")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="runs per case in suite; best time is kept")
+    parser.add_argument('--json', metavar='FILE',
+                        help="save suite results as JSON")
+    parser.add_argument('--compare', metavar='FILE',
+                        help="compare suite results with saved JSON")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="ratio to baseline counted as slower")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark : {}".format(name))
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    slower = 0
+    for name in args.names or BENCHMARKS:
+        slower += BENCHMARKS[name](args) or 0
+    sys.exit(1 if slower else 0)
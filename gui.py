@@ -184,7 +184,7 @@ class MatrixEventHandler(EventHandler):
     def get_matrix(self, num, max_row, max_col):
         return Matrix([[int(self._values[(num, j, i)])
                         for i in range(1, max_col + 1)]
-                       for j in range(1, max_row + 1)])
+                       for j in range(1, max_row + 1)], dtype='int')
 
     def choose_processer(self):
         OFFSET = -2
@@ -1,740 +1,5153 @@
 """
 Matrix : Self made matrix module with step-by-step solution!
 """
+import argparse
+import json
+import mmap
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import queue
+import struct
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from abc import ABCMeta, abstractmethod
+from array import array
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor
 from fractions import Fraction
-from typing import Optional, Tuple, Union
+from itertools import islice, product, zip_longest
+from math import gcd, lcm
+from operator import add, mul, sub
+from typing import (Callable, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _to_int(x) -> int:
+    x = Fraction(x)
+    if x.denominator != 1:
+        raise ValueError('{} is not an integer.'.format(x))
+    return x.numerator
+
+
+def _zero_division_error(err: ZeroDivisionError) -> ZeroDivisionError:
+    """
+    Make readable error from ZeroDivisionError of Fraction or float.
+    """
+    err_str = err.args[0]
+    if not err_str.startswith('Fraction('):
+        return ZeroDivisionError("Error : Attempt to divide with 0.")
+    a, _ = err_str.split(", ")
+    a = a[9:]
+    return ZeroDivisionError("Error : Attempt to divide " + a + " with 0.")
+
+
+def _singular_error(numerator) -> ZeroDivisionError:
+    """
+    Make same error as dividing exact `numerator` with determinant 0.
+    """
+    try:
+        Fraction(numerator) / 0
+    except ZeroDivisionError as e:
+        return _zero_division_error(e)
+
+
+_CONVERTERS = {'fraction': Fraction, 'int': _to_int, 'float': float}
+
+
+def _parse_row(tokens: List[str], dtype: str) -> list:
+    """
+    Convert tokens of one row to elements of `dtype`.
+    Row of plain integers is read with int, without parsing Fraction.
+    Other tokens can be like '3/4' or '0.25'.
+    """
+    fast = float if dtype == 'float' else int
+    try:
+        values = list(map(fast, tokens))
+    except ValueError:
+        values = []
+        for x in tokens:
+            try:
+                values.append(Fraction(x))
+            except (ValueError, ZeroDivisionError):
+                raise ValueError('{!r} is not a number.'.format(x))
+        return list(map(_CONVERTERS[dtype], values))
+    if dtype == 'fraction':
+        return list(map(Fraction, values))
+    return values
+
+
+def _read_lines(stream, chunk_size: int) -> Iterator[str]:
+    """
+    Iterate over lines of text stream, reading `chunk_size` at a time.
+    """
+    tail = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (tail + chunk).split('\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def _text_rows(stream, delimiter: Optional[str],
+               chunk_size: int) -> Iterator[List[str]]:
+    """
+    Iterate over tokens of each line of text stream, skipping blank lines.
+    Raises ValueError if rows have different lengths.
+    """
+    rows = 0
+    for next_line in _read_lines(stream, chunk_size):
+        tokens = next_line.split(delimiter)
+        if delimiter is not None:
+            tokens = [x.strip() for x in tokens]
+            if tokens == ['']:
+                continue
+        elif not tokens:
+            continue
+        if rows == 0:
+            cols = len(tokens)
+        elif len(tokens) != cols:
+            raise ValueError(
+                'Row {} has {} elements, while row 1 has {}'
+                .format(rows + 1, len(tokens), cols))
+        rows += 1
+        yield tokens
+
+
+def _copy_nested(mat: list) -> list:
+    if mat and isinstance(mat[0], list):
+        return [_copy_nested(x) for x in mat]
+    return mat[:]
+
+
+_ELLIPSIS = '...'
+
+
+def _leaf_rows(mat: list, ndim: int) -> Iterator[list]:
+    """
+    Iterate over 1D lists which hold the elements of `mat`.
+    """
+    if ndim == 1:
+        yield mat
+        return
+    for next_block in mat:
+        yield from _leaf_rows(next_block, ndim - 1)
+
+
+def _map_nested(func, first: list, second, ndim: int) -> list:
+    """
+    Apply `func` elementwise to `first` and `second`, which is matrix of
+    same shape or scalar. Returns new nested lists.
+    """
+    if ndim == 1:
+        if isinstance(second, list):
+            return list(map(func, first, second))
+        return [func(x, second) for x in first]
+    if isinstance(second, list):
+        return [_map_nested(func, x, y, ndim - 1)
+                for x, y in zip(first, second)]
+    return [_map_nested(func, x, second, ndim - 1) for x in first]
+
+
+def _summarize(mat: list, edge_items: Optional[int]) -> list:
+    """
+    Get items of `mat` to show, cutting middle of long axes to `_ELLIPSIS`.
+    """
+    if edge_items is None or len(mat) <= 2 * edge_items:
+        items = list(mat)
+    else:
+        items = list(mat[:edge_items]) + [_ELLIPSIS] +\
+            list(mat[len(mat) - edge_items:])
+    if mat and isinstance(mat[0], list):
+        return [x if x is _ELLIPSIS else _summarize(x, edge_items)
+                for x in items]
+    return items
+
+
+def _format_matrix(mat: list, ndim: int,
+                   edge_items: Optional[int] = None) -> str:
+    """
+    Format matrix with every column right-aligned to its widest element.
+    String of each element is made once, and used for both
+    measuring widths and writing.
+    """
+    if not mat:
+        return "[]"
+    view = _summarize(mat, edge_items)
+    leaf_rows = []
+
+    def collect(block, depth):
+        if depth == ndim - 1:
+            leaf_rows.append(list(map(str, block)))
+            return
+        for child in block:
+            if child is not _ELLIPSIS:
+                collect(child, depth + 1)
+
+    collect(view, 0)
+    widths = [max(map(len, column)) for column in zip(*leaf_rows)]
+    leaf_iter = iter(leaf_rows)
+    parts = []
+
+    def write(block, depth):
+        parts.append("[")
+        if depth == ndim - 1:
+            parts.append(" ".join([x.rjust(width) for x, width
+                                   in zip(next(leaf_iter), widths)]))
+        else:
+            for i, child in enumerate(block):
+                if i:
+                    parts.append("\n" + " " * (depth + 1))
+                if child is _ELLIPSIS:
+                    parts.append(_ELLIPSIS)
+                else:
+                    write(child, depth + 1)
+        parts.append("]")
+
+    write(view, 0)
+    return "".join(parts)
+
+
+def _nested_shape(mat: list) -> Tuple[int, ...]:
+    """
+    Get shape of nested list, checking that it is not ragged.
+
+    Raises
+    ------
+    ValueError
+        If rows have different shapes.
+    """
+    if not mat:
+        return (0,)
+    if not isinstance(mat[0], list):
+        if any(isinstance(x, list) for x in mat):
+            raise ValueError('Matrix has both rows and numbers '
+                             'in same dimension')
+        return (len(mat),)
+    row_shape = _nested_shape(mat[0])
+    for next_row in mat[1:]:
+        if not isinstance(next_row, list) or\
+                _nested_shape(next_row) != row_shape:
+            raise ValueError('Every row of matrix must have same shape, '
+                             'but {} and {} are given'
+                             .format(mat[0], next_row))
+    return (len(mat),) + row_shape
+
+
+def _trusted_shape(mat: list) -> Tuple[int, ...]:
+    """
+    Get shape of nested list, looking only at first rows.
+    """
+    to_return = (len(mat),)
+    while mat and isinstance(mat[0], list):
+        mat = mat[0]
+        to_return += (len(mat),)
+    return to_return
+
+
+def _common_dtype(*args) -> str:
+    """
+    Get dtype which can hold elements of every given matrix or scalar.
+    """
+    dtypes = set()
+    for next_arg in args:
+        if isinstance(next_arg, float):
+            dtypes.add('float')
+        elif isinstance(next_arg, int):
+            dtypes.add('int')
+        else:
+            dtypes.add(getattr(next_arg, 'dtype', 'fraction'))
+    for dtype in ('float', 'fraction'):
+        if dtype in dtypes:
+            return dtype
+    return 'int'
+
+
+def _float_det(rows: List[List[float]]) -> float:
+    """
+    Determinant of float matrix using elimination with partial pivoting.
+    `rows` is modified in place.
+    """
+    size = len(rows)
+    to_return = 1.0
+    for k in range(size):
+        pivot_row = max(range(k, size), key=lambda i: abs(rows[i][k]))
+        if rows[pivot_row][k] == 0:
+            return 0.0
+        if pivot_row != k:
+            rows[k], rows[pivot_row] = rows[pivot_row], rows[k]
+            to_return = -to_return
+        pivot = rows[k][k]
+        to_return *= pivot
+        for i in range(k + 1, size):
+            factor = rows[i][k] / pivot
+            if factor == 0:
+                continue
+            next_row = rows[i]
+            for j in range(k + 1, size):
+                next_row[j] -= factor * rows[k][j]
+    return to_return
+
+
+def _scale_rows(mat) -> Tuple[List[List[int]], List[int]]:
+    """
+    Scale every row of `mat` by the lcm of its denominators.
+    Returns integer rows and the scale used for each row.
+    """
+    rows = []
+    scales = []
+    for next_row in mat:
+        if all(x.__class__ is int for x in next_row):
+            rows.append(list(next_row))
+            scales.append(1)
+            continue
+        next_row = [Fraction(x) for x in next_row]
+        row_lcm = lcm(*[x.denominator for x in next_row])
+        rows.append([x.numerator * (row_lcm // x.denominator)
+                     for x in next_row])
+        scales.append(row_lcm)
+    return rows, scales
+
+
+def _integerize_rows(mat) -> Tuple[List[List[int]], int]:
+    """
+    Scale every row of `mat` by the lcm of its denominators.
+    Returns integer rows and the product of the scales used.
+    """
+    rows, scales = _scale_rows(mat)
+    scale = 1
+    for next_scale in scales:
+        scale *= next_scale
+    return rows, scale
+
+
+def _blocked_matmul(a: list, b_cols: list, block_size: int) -> list:
+    """
+    Multiply rows `a` with columns `b_cols`, one block of columns at a time.
+    """
+    to_return = [[] for _ in a]
+    for start in range(0, len(b_cols), block_size):
+        col_block = b_cols[start:start + block_size]
+        for next_row, next_result in zip(a, to_return):
+            next_result.extend([sum(map(mul, next_row, next_col))
+                                for next_col in col_block])
+    return to_return
+
+
+def _quarters(mat: list, row_half: int, col_half: int) -> Tuple[list, ...]:
+    width = 2 * col_half
+    padded = [list(next_row) + [0] * (width - len(next_row))
+              for next_row in mat]
+    padded += [[0] * width for _ in range(2 * row_half - len(mat))]
+    top, bottom = padded[:row_half], padded[row_half:]
+    return ([x[:col_half] for x in top], [x[col_half:] for x in top],
+            [x[:col_half] for x in bottom], [x[col_half:] for x in bottom])
+
+
+def _elementwise(func, first: list, second: list) -> list:
+    return [list(map(func, x, y)) for x, y in zip(first, second)]
+
+
+def _np_matmul(a: list, b: list) -> List[List[float]]:
+    """
+    Multiply float rows `a` with rows `b` using NumPy.
+    """
+    return (np.array(a, dtype=float) @ np.array(b, dtype=float)).tolist()
+
+
+def _strassen_matmul(a: list, b: list, threshold: int,
+                     block_size: int) -> list:
+    """
+    Multiply rows `a` with rows `b` using Strassen algorithm.
+    Blocks smaller than `threshold` use `_blocked_matmul`.
+    """
+    row, inner, col = len(a), len(b), len(b[0])
+    if min(row, inner, col) <= threshold:
+        return _blocked_matmul(a, list(zip(*b)), block_size)
+    row_half = (row + 1) // 2
+    inner_half = (inner + 1) // 2
+    col_half = (col + 1) // 2
+    a11, a12, a21, a22 = _quarters(a, row_half, inner_half)
+    b11, b12, b21, b22 = _quarters(b, inner_half, col_half)
+
+    def recurse(x, y):
+        return _strassen_matmul(x, y, threshold, block_size)
+
+    m1 = recurse(_elementwise(add, a11, a22), _elementwise(add, b11, b22))
+    m2 = recurse(_elementwise(add, a21, a22), b11)
+    m3 = recurse(a11, _elementwise(sub, b12, b22))
+    m4 = recurse(a22, _elementwise(sub, b21, b11))
+    m5 = recurse(_elementwise(add, a11, a12), b22)
+    m6 = recurse(_elementwise(sub, a21, a11), _elementwise(add, b11, b12))
+    m7 = recurse(_elementwise(sub, a12, a22), _elementwise(add, b21, b22))
+    c11 = _elementwise(add, _elementwise(sub, _elementwise(add, m1, m4), m5),
+                       m7)
+    c12 = _elementwise(add, m3, m5)
+    c21 = _elementwise(add, m2, m4)
+    c22 = _elementwise(add, _elementwise(add, _elementwise(sub, m1, m2), m3),
+                       m6)
+    to_return = [x + y for x, y in zip(c11, c12)] +\
+        [x + y for x, y in zip(c21, c22)]
+    return [next_row[:col] for next_row in to_return[:row]]
+
+
+def _matmul_rows(a: list, b: list, dtype: str, block_size: int,
+                 strassen_threshold: Optional[int],
+                 transposed: Tuple[bool, bool] = (False, False),
+                 scalar=1) -> list:
+    """
+    Multiply 2D nested lists `a` and `b`, and then `scalar`.
+    If `transposed` is true for an operand, its transpose is used,
+    by reading it in transposed order instead of making it.
+    Fraction elements are multiplied as scaled integers,
+    and divided only once per result element, with scalar folded in.
+    """
+    a_rows = zip(*a) if transposed[0] else a
+    b_cols = b if transposed[1] else zip(*b)
+    if dtype == 'fraction':
+        a_rows, a_scales = _scale_rows(a_rows)
+        b_cols, b_scales = _scale_rows(b_cols)
+    else:
+        if transposed[0]:
+            a_rows = [list(x) for x in a_rows]
+        if not transposed[1]:
+            b_cols = [list(x) for x in b_cols]
+    if strassen_threshold is not None:
+        to_return = _strassen_matmul(a_rows, [list(x) for x in zip(*b_cols)],
+                                     strassen_threshold, block_size)
+    else:
+        to_return = _blocked_matmul(a_rows, b_cols, block_size)
+    if dtype == 'fraction':
+        scalar = Fraction(scalar)
+        numerator, denominator = scalar.numerator, scalar.denominator
+        to_return = [[Fraction(x * numerator,
+                               row_scale * col_scale * denominator)
+                      for x, col_scale in zip(next_row, b_scales)]
+                     for next_row, row_scale in zip(to_return, a_scales)]
+    elif scalar != 1:
+        to_return = [[x * scalar for x in next_row]
+                     for next_row in to_return]
+    return to_return
+
+
+def _mod_matmul(a: List[List[int]], b: List[List[int]],
+                mod: int) -> List[List[int]]:
+    """
+    Multiply integer rows `a` and `b`, reducing each element modulo `mod`.
+    """
+    b_cols = list(zip(*b))
+    return [[sum(map(mul, next_row, next_col)) % mod for next_col in b_cols]
+            for next_row in a]
+
+
+_PRIME_LIMIT = 1 << 31
+_PRIMES: List[int] = []
+
+
+def _is_prime(num: int) -> bool:
+    """
+    Deterministic Miller-Rabin test, exact for `num` below 3 * 10^14.
+    """
+    if num < 2:
+        return False
+    bases = (2, 3, 5, 7, 11, 13, 17)
+    if num in bases:
+        return True
+    if any(num % base == 0 for base in bases):
+        return False
+    odd, twos = num - 1, 0
+    while odd % 2 == 0:
+        odd //= 2
+        twos += 1
+    for base in bases:
+        x = pow(base, odd, num)
+        if x in (1, num - 1):
+            continue
+        for _ in range(twos - 1):
+            x = x * x % num
+            if x == num - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _modular_primes() -> Iterator[int]:
+    """
+    Primes below 2^31 from largest, so product of two fits in int64.
+    Found primes are kept in `_PRIMES`.
+    """
+    i = 0
+    while True:
+        if i == len(_PRIMES):
+            candidate = _PRIMES[-1] - 2 if _PRIMES else _PRIME_LIMIT - 1
+            while not _is_prime(candidate):
+                candidate -= 2
+            _PRIMES.append(candidate)
+        yield _PRIMES[i]
+        i += 1
+
+
+def _mod_eliminate(rows: List[List[int]], prime: int) -> Tuple[int, int]:
+    """
+    Gauss elimination of integer rows modulo `prime`,
+    using NumPy int64 if it is installed.
+    Returns rank and determinant modulo `prime`.
+    Determinant is 0 unless rows are square and of full rank.
+    """
+    table = [[x % prime for x in next_row] for next_row in rows]
+    row_count, col_count = len(table), len(table[0])
+    if np is not None:
+        table = np.array(table, dtype=np.int64)
+    rank = 0
+    det = 1 if row_count == col_count else 0
+    for c in range(col_count):
+        if np is not None:
+            non_zero = np.flatnonzero(table[rank:, c])
+            pivot_row = rank + int(non_zero[0]) if len(non_zero) else None
+        else:
+            pivot_row = next((i for i in range(rank, row_count)
+                              if table[i][c]), None)
+        if pivot_row is None:
+            det = 0
+            continue
+        if pivot_row != rank:
+            if np is not None:
+                table[[rank, pivot_row]] = table[[pivot_row, rank]]
+            else:
+                table[rank], table[pivot_row] = table[pivot_row], table[rank]
+            det = -det
+        pivot = int(table[rank][c])
+        det = det * pivot % prime
+        inverse = pow(pivot, -1, prime)
+        if np is not None:
+            tail = table[rank, c + 1:] * inverse % prime
+            table[rank + 1:, c + 1:] = (
+                table[rank + 1:, c + 1:] -
+                np.outer(table[rank + 1:, c], tail) % prime) % prime
+        else:
+            tail = [x * inverse % prime for x in table[rank][c + 1:]]
+            for next_row in islice(table, rank + 1, None):
+                factor = next_row[c]
+                if factor:
+                    next_row[c + 1:] = [
+                        (x - factor * y) % prime
+                        for x, y in zip(islice(next_row, c + 1, None), tail)]
+        rank += 1
+        if rank == row_count:
+            break
+    return rank, det % prime
+
+
+def _hadamard_square(rows: List[List[int]]) -> int:
+    """
+    Square of Hadamard bound, which no minor of `rows` can exceed
+    in absolute value. Zero rows count as 1.
+    """
+    to_return = 1
+    for next_row in rows:
+        to_return *= max(1, sum(x * x for x in next_row))
+    return to_return
+
+
+def _modular_det(rows: List[List[int]]) -> int:
+    """
+    Exact determinant of square integer rows, from determinants modulo
+    primes joined by Chinese remainder theorem.
+    Primes are added until their product is over twice Hadamard bound,
+    so negative result is told from positive one.
+    """
+    bound_square = _hadamard_square(rows)
+    to_return, modulus = 0, 1
+    for prime in _modular_primes():
+        _, det = _mod_eliminate(rows, prime)
+        to_return += modulus * ((det - to_return) *
+                                pow(modulus, -1, prime) % prime)
+        modulus *= prime
+        if modulus * modulus > 4 * bound_square:
+            break
+    return to_return - modulus if to_return > modulus // 2 else to_return
+
+
+def _modular_rank(rows: List[List[int]]) -> int:
+    """
+    Exact rank of integer rows. Rank modulo prime is never over the
+    exact rank, and equals it unless prime divides every largest nonzero
+    minor. So ranks are taken until product of primes is over Hadamard
+    bound, or full rank is found.
+    """
+    bound_square = _hadamard_square(rows)
+    full_rank = min(len(rows), len(rows[0]))
+    to_return, modulus = 0, 1
+    for prime in _modular_primes():
+        to_return = max(to_return, _mod_eliminate(rows, prime)[0])
+        modulus *= prime
+        if to_return == full_rank or modulus * modulus > bound_square:
+            return to_return
+
+
+def _broadcast_shape(first: Tuple[int, ...], second: Tuple[int, ...]
+                     ) -> Tuple[int, ...]:
+    """
+    Broadcast batch shapes like NumPy. Shapes are aligned from the end,
+    and axis of length 1 or missing axis is repeated to fit the other.
+    """
+    to_return = []
+    for x, y in zip_longest(reversed(first), reversed(second), fillvalue=1):
+        if x != y and 1 not in (x, y):
+            raise ValueError('Cannot broadcast batch shapes {} and {}'
+                             .format(first, second))
+        to_return.append(y if x == 1 else x)
+    return tuple(reversed(to_return))
+
+
+def _batch_slices(mat: list, batch_shape: Tuple[int, ...],
+                  out_shape: Tuple[int, ...]) -> list:
+    """
+    2D slices of `mat` for every index of `out_shape`, in row-major order.
+    Axis of length 1 uses index 0 for every index, like stride 0,
+    so slices are references into `mat` and nothing is copied.
+    """
+    offset = len(out_shape) - len(batch_shape)
+    to_return = []
+    for index in product(*[range(x) for x in out_shape]):
+        block = mat
+        for axis_len, i in zip(batch_shape, index[offset:]):
+            block = block[0 if axis_len == 1 else i]
+        to_return.append(block)
+    return to_return
+
+
+def _batched_matmul(a: list, b: list, a_shape: Tuple[int, ...],
+                    b_shape: Tuple[int, ...], dtype: str, block_size: int,
+                    strassen_threshold: Optional[int]) -> Tuple[list, tuple]:
+    """
+    Multiply stacks of 2D matrixes with broadcasting over batch axes.
+    Slices sharing one operand are joined into one 2D multiply:
+    rows of left ones are stacked if right one is shared,
+    and columns of right ones are joined if left one is shared.
+    Returns 2D results in row-major order of batch, and batch shape.
+    """
+    out_batch = _broadcast_shape(a_shape[:-2], b_shape[:-2])
+    a_slices = _batch_slices(a, a_shape[:-2], out_batch)
+    b_slices = _batch_slices(b, b_shape[:-2], out_batch)
+    shared_b = len({id(x) for x in b_slices}) <= \
+        len({id(x) for x in a_slices})
+    groups = {}
+    for i, slices in enumerate(zip(a_slices, b_slices)):
+        groups.setdefault(id(slices[1] if shared_b else slices[0]),
+                          []).append(i)
+    to_return = [None] * len(a_slices)
+    for indexes in groups.values():
+        if shared_b:
+            rows = _matmul_rows(
+                [next_row for i in indexes for next_row in a_slices[i]],
+                b_slices[indexes[0]], dtype, block_size, strassen_threshold)
+            start = 0
+            for i in indexes:
+                to_return[i] = rows[start:start + len(a_slices[i])]
+                start += len(a_slices[i])
+        else:
+            rows = _matmul_rows(
+                a_slices[indexes[0]],
+                [[x for i in indexes for x in b_slices[i][k]]
+                 for k in range(b_shape[-2])],
+                dtype, block_size, strassen_threshold)
+            width = b_shape[-1]
+            for pos, i in enumerate(indexes):
+                to_return[i] = [next_row[pos * width:(pos + 1) * width]
+                                for next_row in rows]
+    return to_return, out_batch
+
+
+def _bareiss_eliminate(rows: List[List[int]], size: int
+                       ) -> Tuple[List[int], int, bool]:
+    """
+    Fraction-free elimination of integer rows using Bareiss algorithm.
+    Every division is exact, so all values stay as int.
+
+    `rows` is modified in place. Only first `size` columns are eliminated,
+    so rows can be augmented with right-side columns.
+    After elimination, upper triangle keeps U, and lower triangle keeps
+    the multiplier used for each row in each step.
+    Returns row permutation, its sign, and False if matrix is singular.
+    """
+    perm = list(range(len(rows)))
+    sign = 1
+    prev_pivot = 1
+    for k in range(size):
+        if rows[k][k] == 0:
+            pivot_row = next((i for i in range(k + 1, size)
+                              if rows[i][k] != 0), None)
+            if pivot_row is None:
+                return perm, sign, False
+            rows[k], rows[pivot_row] = rows[pivot_row], rows[k]
+            perm[k], perm[pivot_row] = perm[pivot_row], perm[k]
+            sign = -sign
+        pivot = rows[k][k]
+        pivot_tail = rows[k][k + 1:]
+        for next_row in islice(rows, k + 1, None):
+            factor = next_row[k]
+            next_row[k + 1:] = [(x * pivot - factor * y) // prev_pivot
+                                for x, y in zip(islice(next_row, k + 1, None),
+                                                pivot_tail)]
+        prev_pivot = pivot
+    return perm, sign, True
+
+
+def _bareiss_det(rows: List[List[int]]) -> int:
+    """
+    Fraction-free determinant of integer matrix using Bareiss algorithm.
+    `rows` is modified in place.
+    """
+    _, sign, regular = _bareiss_eliminate(rows, len(rows))
+    return sign * rows[-1][-1] if regular else 0
+
+
+def _det_chunk(data: Union[array, List[int]], width: int,
+               tasks: List[Tuple[Tuple[int, ...], Tuple[int, ...]]]
+               ) -> List[int]:
+    """
+    Worker of `_parallel_dets`. `data` is flat integer matrix with `width`
+    columns, and each task is row indexes and column indexes of
+    sub-matrix to get determinant of.
+    """
+    to_return = []
+    for rows, cols in tasks:
+        if not rows:
+            to_return.append(1)
+            continue
+        to_return.append(_bareiss_det([[data[i * width + j] for j in cols]
+                                       for i in rows]))
+    return to_return
+
+
+def _parallel_dets(mat: list,
+                   tasks: List[Tuple[Tuple[int, ...], Tuple[int, ...]]],
+                   workers: Optional[int] = None,
+                   executor: Optional[Executor] = None) -> List[Fraction]:
+    """
+    Exact determinants of sub-matrixes of `mat` chosen by `tasks`,
+    calculated in process pool. Rows are scaled to integers once,
+    and sent flat with a chunk of tasks instead of nested Fractions.
+    New pool of `workers` processes is used if `executor` is not given.
+    Tasks are split into 4 chunks for each of `workers`.
+    """
+    if executor is None:
+        with ProcessPoolExecutor(workers) as pool:
+            return _parallel_dets(mat, tasks, workers, pool)
+    rows, scales = _scale_rows(mat)
+    data = _pack_ints([x for next_row in rows for x in next_row])
+    chunk_size = -(-len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+    chunks = [tasks[i:i + chunk_size]
+              for i in range(0, len(tasks), chunk_size)]
+    futures = [executor.submit(_det_chunk, data, len(rows[0]), chunk)
+               for chunk in chunks]
+    to_return = []
+    for chunk, future in zip(chunks, futures):
+        for (task_rows, _), det in zip(chunk, future.result()):
+            scale = 1
+            for i in task_rows:
+                scale *= scales[i]
+            to_return.append(Fraction(det, scale))
+    return to_return
+
+
+def _bareiss_back_substitute(table: List[List[int]],
+                             rhs: List[List[int]]) -> List[List[int]]:
+    """
+    Fraction-free back substitution on upper triangle of `table`
+    eliminated by `_bareiss_eliminate`.
+    Returns integer roots multiplied by the last pivot. `rhs` is modified.
+    """
+    last_pivot = table[-1][-1]
+    for i in range(len(table) - 1, -1, -1):
+        row_i = table[i]
+        next_result = [x * last_pivot for x in rhs[i]]
+        for j in range(i + 1, len(table)):
+            if row_i[j] != 0:
+                next_result = [x - row_i[j] * y for x, y
+                               in zip(next_result, rhs[j])]
+        rhs[i] = [x // row_i[i] for x in next_result]
+    return rhs
+
+
+def _bareiss_solve(a: list, b: list) -> Optional[List[List[Fraction]]]:
+    """
+    Solve `a @ X == b` exactly by eliminating augmented rows `[a | b]`.
+    `b` is 2D. Returns None if `a` is singular.
+    """
+    size = len(a)
+    rows, _ = _scale_rows([list(a_row) + list(b_row)
+                           for a_row, b_row in zip(a, b)])
+    if not _bareiss_eliminate(rows, size)[2]:
+        return None
+    roots = _bareiss_back_substitute(
+        [next_row[:size] for next_row in rows],
+        [next_row[size:] for next_row in rows])
+    last_pivot = rows[-1][size - 1]
+    return [[Fraction(x, last_pivot) for x in next_row]
+            for next_row in roots]
+
+
+def _float_solve_batch(As: list, Bs: list
+                       ) -> List[Optional[List[List[float]]]]:
+    """
+    Float roots of systems of same shape, as 2D rows, or None if singular.
+    With NumPy, systems are stacked and solved together.
+    """
+    if Bs and not isinstance(Bs[0][0], list):
+        Bs = [[[x] for x in b] for b in Bs]
+    if np is None:
+        to_return = []
+        for a, b in zip(As, Bs):
+            lu = LUDecomposition(a, 'float')
+            to_return.append(lu.solve_many(b) if lu.regular else None)
+        return to_return
+    a_stack = np.array([[[float(x) for x in next_row] for next_row in a]
+                        for a in As])
+    b_stack = np.array([[[float(x) for x in next_row] for next_row in b]
+                        for b in Bs])
+    try:
+        return np.linalg.solve(a_stack, b_stack).tolist()
+    except np.linalg.LinAlgError:
+        pass
+    to_return = []
+    for a, b in zip(a_stack, b_stack):
+        try:
+            to_return.append(np.linalg.solve(a, b).tolist())
+        except np.linalg.LinAlgError:
+            to_return.append(None)
+    return to_return
+
+
+BatchResult = namedtuple('BatchResult', ['solutions', 'status'])
+BatchResult.__doc__ = """
+Results of `Matrix.solve_batch`, kept as two lists of same length.
+`solutions[i]` is None unless `status[i]` is 'ok'.
+Other status are 'singular' and 'invalid' for wrong shape.
+"""
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class MinorCache:
+    """
+    LRU cache for determinants of minors of one matrix.
+    Minor is keyed by bitmask of removed rows and removed columns,
+    so minor with row i and column j removed is `(1 << i, 1 << j)`.
+    Determinants of int matrix are kept as int.
+
+    Parameters
+    ----------
+    mat
+        Square matrix to get minors from.
+    maxsize
+        Maximum number of minors to keep.
+        Least recently used one is dropped when full.
+
+    Examples
+    --------
+    Share one cache between calls on same matrix:
+
+    >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
+    >>> cache = MinorCache(a)
+    >>> inverse = a.inv_using_det(cache=cache)
+    >>> print(a.determinant(method='cofactor', cache=cache))
+    -1
+    >>> cache.cache_info()
+    CacheInfo(hits=3, misses=10, maxsize=65536, currsize=10)
+    """
+    def __init__(self, mat: list, maxsize: int = 65536):
+        self.mat = mat
+        self._integer = getattr(mat, 'dtype', 'fraction') == 'int'
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def minor(self, removed_rows: int = 0, removed_cols: int = 0,
+              method: str = 'bareiss') -> Fraction:
+        """
+        Get determinant of minor without given rows and columns.
+
+        Parameters
+        ----------
+        removed_rows
+            Bitmask of removed rows.
+        removed_cols
+            Bitmask of removed columns.
+        method
+            'bareiss' or 'cofactor'. See `Matrix.determinant`.
+            Cofactor expansion reuses cached sub-minors,
+            so it takes O(n * 2^n) instead of O(n!).
+
+        Returns
+        -------
+        Fraction or int
+            Determinant of the minor.
+        """
+        key = (removed_rows, removed_cols)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+        rows = [i for i in range(len(self.mat)) if not removed_rows >> i & 1]
+        cols = [j for j in range(len(self.mat)) if not removed_cols >> j & 1]
+        if len(rows) != len(cols):
+            raise ValueError('Minor must be square, but {} rows and {} '
+                             'columns remain'.format(len(rows), len(cols)))
+        if not rows:
+            to_return = 1 if self._integer else Fraction(1)
+        elif method == 'bareiss':
+            sub_rows, scale = _integerize_rows(
+                [[self.mat[i][j] for j in cols] for i in rows])
+            to_return = _bareiss_det(sub_rows)
+            if not self._integer:
+                to_return = Fraction(to_return, scale)
+        else:
+            first_row = self.mat[rows[0]]
+            to_return = 0 if self._integer else Fraction(0)
+            for pos, j in enumerate(cols):
+                if first_row[j] == 0:
+                    continue
+                to_return += first_row[j] * ((-1)**pos) *\
+                    self.minor(removed_rows | 1 << rows[0],
+                               removed_cols | 1 << j, method)
+        self._cache[key] = to_return
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return to_return
+
+    def minors(self, keys: List[Tuple[int, int]],
+               workers: Optional[int] = None,
+               executor: Optional[Executor] = None) -> List[Fraction]:
+        """
+        Get determinants of many minors.
+
+        Parameters
+        ----------
+        keys
+            Bitmasks of removed rows and removed columns of each minor.
+        workers
+            If given, minors not in the cache are calculated
+            with Bareiss algorithm in a pool of this many processes.
+        executor
+            If given, it is used as the pool instead.
+
+        Raises
+        ------
+        ValueError
+            If a minor is not square.
+
+        Returns
+        -------
+        list
+            Determinant of each minor, in same order as `keys`.
+        """
+        computed = {}
+        missing = [key for key in dict.fromkeys(keys)
+                   if key not in self._cache]
+        if missing and (workers or executor):
+            size = len(self.mat)
+            tasks = []
+            for removed_rows, removed_cols in missing:
+                rows = tuple(i for i in range(size)
+                             if not removed_rows >> i & 1)
+                cols = tuple(j for j in range(size)
+                             if not removed_cols >> j & 1)
+                if len(rows) != len(cols):
+                    raise ValueError(
+                        'Minor must be square, but {} rows and {} '
+                        'columns remain'.format(len(rows), len(cols)))
+                tasks.append((rows, cols))
+            dets = _parallel_dets(self.mat, tasks, workers, executor)
+            for key, det in zip(missing, dets):
+                if self._integer:
+                    det = int(det)
+                self.misses += 1
+                computed[key] = self._cache[key] = det
+                if len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return [computed[key] if key in computed else self.minor(*key)
+                for key in keys]
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Get hit and miss counts of the cache.
+
+        Returns
+        -------
+        CacheInfo
+            Named tuple of hits, misses, maxsize, currsize.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._cache))
+
+    def clear(self) -> None:
+        """
+        Clear cached minors and counters.
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+Step = namedtuple('Step', ['op', 'rows', 'scalar', 'snapshot', 'values'],
+                  defaults=((), None, None, ()))
+Step.__doc__ = """
+One step of step by step solution.
+
+op
+    Type of step. 'state', 'swap', 'divide', 'add' for Gauss elimination,
+    'det' for determinant, 'adjugate', 'transpose', 'inverse_det',
+    'divide_all', 'matrix' for inverse, 'cramer_det', 'cramer_variable',
+    'cramer_divide' for Cramer's formular, 'mul_row' for multiply,
+    'pivot', 'sparse_add' for sparse Gauss elimination.
+rows
+    Row indexes the step works on. Starts with 0.
+scalar
+    Number the step works with.
+snapshot
+    Matrix, or tuple of matrixes, at the step.
+    It is reference to working matrix, so sink should copy it to keep.
+values
+    Other numbers of the step, like terms of determinant.
+    For 'sparse_add', nonzero updates of left side and of right side,
+    each as pairs of column index and new value.
+"""
+
+
+def _freeze(snapshot):
+    if isinstance(snapshot, Matrix):
+        return snapshot.copy()
+    if isinstance(snapshot, tuple):
+        return tuple(_freeze(x) for x in snapshot)
+    return snapshot
+
+
+def _to_json(value):
+    if isinstance(value, Fraction):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_to_json(x) for x in value]
+    return value
+
+
+class TraceSink(metaclass=ABCMeta):
+    """
+    Base class of sinks, which get step by step solution
+    as `Step` records from solvers.
+    """
+    @abstractmethod
+    def emit(self, step: Step) -> None:
+        """
+        Get one step from solver.
+        """
+
+    def close(self) -> None:
+        """
+        Finish getting steps.
+        """
+
+
+class TextPrinter(TraceSink):
+    """
+    Sink printing steps as text, as soon as they are made.
+
+    Parameters
+    ----------
+    file
+        File to print to. If not given, current `sys.stdout` is used.
+    """
+    def __init__(self, file=None):
+        self.file = file
+
+    def _print(self, *args, **kwargs):
+        print(*args, file=self.file or sys.stdout, **kwargs)
+
+    def emit(self, step: Step) -> None:
+        op = step.op
+        if op == 'state':
+            first, second = step.snapshot
+            str_list = [x.strip().replace("[", "").replace("]", "")
+                        for x in str(first).split("\n")]
+            str2_list = [x.strip().replace("[", "").replace("]", "")
+                         for x in str(second).split("\n")]
+            for i in range(len(first)):
+                self._print(str_list[i], "|", str2_list[i])
+        elif op == 'swap':
+            self._print("Change row", step.rows[0] + 1,
+                        "with row", step.rows[1] + 1)
+        elif op == 'divide':
+            self._print("Divide row", step.rows[0] + 1, "by", step.scalar)
+        elif op == 'add':
+            self._print("Add row", step.rows[0] + 1, "*", step.scalar,
+                        "to row", step.rows[1] + 1)
+        elif op == 'det':
+            self._print("Determinant of")
+            self._print(step.snapshot)
+            if not step.values:
+                self._print("is", step.scalar)
+                return
+            terms = []
+            for i, term in enumerate(step.values):
+                if i == len(step.values) - 1:
+                    terms.append(term * ((-1)**i))
+                else:
+                    terms += [term, '-' if i % 2 == 0 else '+']
+            self._print("is", *terms, '=', step.scalar)
+        elif op == 'adjugate':
+            self._print("Get adjugate matrix before transpose")
+            self._print(step.snapshot)
+        elif op == 'transpose':
+            self._print("Transpose it")
+            self._print(step.snapshot)
+        elif op == 'inverse_det':
+            self._print("Get determinant of given matrix")
+        elif op == 'divide_all':
+            self._print("Divide")
+        elif op == 'matrix':
+            self._print(step.snapshot)
+        elif op == 'cramer_det':
+            self._print("Find Determinant of given matrix.")
+        elif op == 'cramer_variable':
+            self._print("Find for variable", step.rows[0] + 1)
+        elif op == 'cramer_divide':
+            self._print("Divide", step.values[0], "with", step.values[1],
+                        ":", step.scalar)
+        elif op == 'mul_row':
+            self._print(", ".join("+".join("{}X{}".format(x, y)
+                                           for x, y in next_elem)
+                                  for next_elem in step.values))
+        elif op == 'pivot':
+            self._print("Pivot at row", step.rows[0] + 1,
+                        "column", step.rows[1] + 1, ":", step.scalar)
+        elif op == 'sparse_add':
+            dest = step.rows[1] + 1
+            left, right = [["({},{})={}".format(dest, j + 1, x)
+                            for j, x in updates] for updates in step.values]
+            self._print("Add row", step.rows[0] + 1, "*", step.scalar,
+                        "to row", dest, ":", *left, "|", *right)
+
+
+class ListSink(TraceSink):
+    """
+    Sink keeping steps in `steps` list, to be rendered later with `render`.
+
+    Parameters
+    ----------
+    snapshots
+        If true, copy of matrix at each step is kept too.
+        If false, snapshot of every step is dropped.
+    """
+    def __init__(self, snapshots: bool = True):
+        self.snapshots = snapshots
+        self.steps = []
+
+    def emit(self, step: Step) -> None:
+        self.steps.append(step._replace(
+            snapshot=_freeze(step.snapshot) if self.snapshots else None))
+
+
+def _step_record(step: Step, snapshots: bool = False) -> dict:
+    record = {'op': step.op, 'rows': list(step.rows),
+              'scalar': _to_json(step.scalar),
+              'values': _to_json(step.values)}
+    if snapshots:
+        record['snapshot'] = _to_json(step.snapshot)
+    return record
+
+
+class JSONLSink(TraceSink):
+    """
+    Sink writing each step as one line of JSON.
+    Fraction is written as string like "3/2".
+
+    Parameters
+    ----------
+    file
+        Path or file object to write to.
+    snapshots
+        If true, matrixes at each step are written too.
+    """
+    def __init__(self, file, snapshots: bool = False):
+        self._own_file = isinstance(file, str)
+        self.file = open(file, 'w') if self._own_file else file
+        self.snapshots = snapshots
+
+    def emit(self, step: Step) -> None:
+        self.file.write(json.dumps(_step_record(step, self.snapshots))
+                        + "\n")
+
+    def close(self) -> None:
+        if self._own_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _StreamClosed(Exception):
+    """
+    Raised in solver thread when its steps are not taken any more.
+    """
+
+
+class _QueueSink(ListSink):
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.steps = queue.Queue(maxsize)
+        self.stopped = threading.Event()
+
+    def put(self, item) -> bool:
+        """
+        Put item to queue, waiting for room only while steps are taken.
+        Return false if they are not taken any more.
+        """
+        while not self.stopped.is_set():
+            try:
+                self.steps.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def emit(self, step: Step) -> None:
+        if not self.put(step._replace(snapshot=_freeze(step.snapshot))):
+            raise _StreamClosed
+
+
+def stream_steps(func: Callable, *args, maxsize: int = 64,
+                 **kwargs) -> Iterator[Step]:
+    """
+    Run solver in other thread, and yield its steps while it works.
+    If iteration stops early, the solver stops at its next step.
+
+    Parameters
+    ----------
+    func
+        Solver taking `trace` argument, like `Matrix.gauss_elim`.
+    args, kwargs
+        Arguments for `func`.
+    maxsize
+        Number of steps to hold before solver waits for them to be taken.
+
+    Returns
+    -------
+    Iterator of Step
+        Steps of the solver. Last one is `Step('result', snapshot=...)`
+        with returned value of the solver.
+
+    Examples
+    --------
+    >>> a = Matrix([[1,2],[3,4]])
+    >>> [step.op for step in stream_steps(a.gauss_elim)][:3]
+    ['state', 'add', 'state']
+    """
+    sink = _QueueSink(maxsize)
+
+    def run():
+        try:
+            result = Step('result',
+                          snapshot=func(*args, trace=sink, **kwargs))
+        except _StreamClosed:
+            return
+        except Exception as e:
+            result = e
+        sink.put(result)
+
+    threading.Thread(target=run, daemon=True).start()
+    try:
+        while True:
+            step = sink.steps.get()
+            if isinstance(step, Exception):
+                raise step
+            yield step
+            if step.op == 'result':
+                return
+    finally:
+        sink.stopped.set()
+
+
+def render(steps: Iterable[Step], file=None) -> None:
+    """
+    Print recorded steps as text, same as step by step solution.
+
+    Parameters
+    ----------
+    steps
+        Steps to print, like `ListSink.steps`.
+    file
+        File to print to. If not given, `sys.stdout` is used.
+
+    Examples
+    --------
+    >>> sink = ListSink()
+    >>> a = Matrix([[1,2],[3,4]])
+    >>> det = a.det_step_by_step(trace=sink)
+    >>> render(sink.steps)
+    Determinant of
+    [[1 2]
+     [3 4]]
+    is -2
+    """
+    printer = TextPrinter(file)
+    for next_step in steps:
+        printer.emit(next_step)
+
+
+def _trace_sink(step_by_step: bool, trace: Optional[TraceSink]
+                ) -> Optional[TraceSink]:
+    if trace is not None:
+        return trace
+    if step_by_step:
+        return TextPrinter()
+    return None
 
 
 class Matrix(list):
     """
-    Self-made class for Matrix. Inherits list.
+    Self-made class for Matrix. Inherits list.
+
+    Parameters
+    ----------
+    arg
+        If given, initialize with given list.
+        Else, initialize with blank list.
+    dtype
+        Type of elements. 'fraction' for exact Fraction,
+        'int' for int, 'float' for float.
+        Float matrix uses NumPy if it is installed.
+
+    Attributes
+    ----------
+    block_size
+        Number of columns calculated together in matrix multiply.
+    strassen_threshold
+        If not None, matrix multiply uses Strassen algorithm until
+        size of block gets smaller than it.
+    """
+    block_size = 64
+    strassen_threshold: Optional[int] = None
+
+    def __init__(self, arg: Optional[list] = None, dtype: str = 'fraction'):
+        if dtype not in _CONVERTERS:
+            raise ValueError('Unknown dtype : {}'.format(dtype))
+        self.dtype = dtype
+        self._shape = (0,)
+        self._lu = None
+        convert = _CONVERTERS[dtype]
+
+        def recurse_fractionalize(mat):
+            if not isinstance(mat[0], list):
+                return [convert(x) for x in mat]
+            return [recurse_fractionalize(x) for x in mat]
+
+        if arg is None:
+            list.__init__(self, [])
+        else:
+            list.__init__(self, arg)
+            self._shape = _nested_shape(self)
+            if self:
+                arg = recurse_fractionalize(self)
+                list.__init__(self, arg)
+
+    @classmethod
+    def _from_trusted(cls, rows: list, dtype: str = 'fraction',
+                      shape: Optional[Tuple[int, ...]] = None) -> 'Matrix':
+        """
+        Make matrix from rows whose elements are already of `dtype`.
+        Rows are used as they are, without copying or converting.
+        """
+        to_return = list.__new__(cls)
+        list.__init__(to_return, rows)
+        to_return.dtype = dtype
+        to_return._shape = shape
+        to_return._lu = None
+        return to_return
+
+    def _changed(self) -> None:
+        self._shape = None
+        self._lu = None
+
+    def __setitem__(self, index, value):
+        self._changed()
+        list.__setitem__(self, index, value)
+
+    def __delitem__(self, index):
+        self._changed()
+        list.__delitem__(self, index)
+
+    def append(self, value):
+        self._changed()
+        list.append(self, value)
+
+    def extend(self, value):
+        self._changed()
+        list.extend(self, value)
+
+    def insert(self, index, value):
+        self._changed()
+        list.insert(self, index, value)
+
+    def pop(self, index=-1):
+        self._changed()
+        return list.pop(self, index)
+
+    def remove(self, value):
+        self._changed()
+        list.remove(self, value)
+
+    def clear(self):
+        self._changed()
+        list.clear(self)
+
+    def copy(self) -> 'Matrix':
+        """
+        Get deep copy of matrix without converting elements again.
+
+        Returns
+        -------
+        Matrix
+            Copied matrix.
+        """
+        return Matrix._from_trusted(_copy_nested(self), self.dtype,
+                                    self._shape)
+
+    def astype(self, dtype: str) -> 'Matrix':
+        """
+        Get copy of matrix with given dtype.
+
+        Parameters
+        ----------
+        dtype
+            'fraction', 'int' or 'float'.
+
+        Returns
+        -------
+        Matrix
+            Converted matrix.
+
+        Examples
+        --------
+        >>> a = Matrix([[1,2],[3,4]], dtype='float')
+        >>> print(a @ a.astype('int'))
+        [[ 7.0 10.0]
+         [15.0 22.0]]
+        """
+        return Matrix(self, dtype)
+
+    def __str__(self):
+        """
+        __str__ method for `str()`.
+        """
+        return _format_matrix(self, self.ndim)
+
+    def summary(self, edge_items: int = 3) -> str:
+        """
+        Get string of the matrix, showing only first and last
+        `edge_items` rows and columns of each axis.
+
+        Parameters
+        ----------
+        edge_items
+            Number of items to show at each end of an axis.
+
+        Returns
+        -------
+        str
+            Summarized string of the matrix.
+
+        Examples
+        --------
+        >>> a = Matrix([[i * 10 + j for j in range(8)] for i in range(8)])
+        >>> print(a.summary(2))
+        [[ 0  1 ...  6  7]
+         [10 11 ... 16 17]
+         ...
+         [60 61 ... 66 67]
+         [70 71 ... 76 77]]
+        """
+        return _format_matrix(self, self.ndim, edge_items)
+
+    def __matmul__(self, other):
+        """
+        __matmul__ method for `@`.
+        Based on PEP 465.
+
+        Raises
+        ------
+        ValueError
+            If matrix multiply is unsupported.
+        """
+        if isinstance(other, (LazyMatrix, SparseMatrix, MappedMatrix)):
+            return NotImplemented
+        if not isinstance(other, list):
+            raise ValueError("Attempt to multiply matrix with {}"
+                             .format(type(other).__name__))
+        dtype = _common_dtype(self, other)
+        a = self if self.dtype == dtype else Matrix(self, dtype)
+        b = other if getattr(other, 'dtype', None) == dtype\
+            else Matrix(other, dtype)
+        a_1d = False
+        b_1d = False
+        if a.ndim == 1:
+            a_1d = True
+            a = Matrix._from_trusted([a], dtype)
+        if b.ndim == 1:
+            b_1d = True
+            b = Matrix._from_trusted([[x] for x in b], dtype)
+        if a.ndim > 2 or b.ndim > 2:
+            return self._batched_matmul(a, b, a_1d, b_1d, dtype)
+
+        if len(a[0]) != len(b):
+            raise ValueError(
+                'Attempt to multiply {}*{} matrix with {}*{} matrix'
+                .format(len(a), len(a[0]), len(b), len(b[0])))
+        if dtype == 'float' and np is not None:
+            to_return = Matrix._from_trusted(_np_matmul(a, b), dtype)
+        else:
+            to_return = Matrix._from_trusted(
+                _matmul_rows(a, b, dtype, self.block_size,
+                             self.strassen_threshold), dtype,
+                (len(a), len(b[0])))
+        if a_1d and b_1d:
+            return to_return[0][0]
+        if a_1d:
+            return Matrix._from_trusted(to_return[0], dtype)
+        if b_1d:
+            return Matrix._from_trusted(to_return.T[0], dtype)
+        return to_return
+
+    def _batched_matmul(self, a: 'Matrix', b: 'Matrix', a_1d: bool,
+                        b_1d: bool, dtype: str) -> 'Matrix':
+        """
+        N-dimensional matrix multiply with broadcasting, based on PEP 465.
+        Last two axes are multiplied, and others are batch axes.
+        `a_1d` and `b_1d` tell which axis added to 1D operand to drop.
+        """
+        a_shape, b_shape = a.shape, b.shape
+        if a_shape[-1] != b_shape[-2]:
+            raise ValueError(
+                'Attempt to multiply {} matrix with {} matrix'
+                .format('*'.join(map(str, a_shape)),
+                        '*'.join(map(str, b_shape))))
+        if dtype == 'float' and np is not None:
+            results = np.matmul(np.array(a, dtype=float),
+                                np.array(b, dtype=float))
+            batch = results.shape[:-2]
+            results = results.reshape((-1,) + results.shape[-2:]).tolist()
+        else:
+            results, batch = _batched_matmul(
+                a, b, a_shape, b_shape, dtype, self.block_size,
+                self.strassen_threshold)
+        shape = batch + (a_shape[-2], b_shape[-1])
+        if a_1d:
+            results = [x[0] for x in results]
+            shape = shape[:-2] + shape[-1:]
+        if b_1d:
+            results = [[x[0] for x in next_row] if not a_1d
+                       else next_row[0] for next_row in results]
+            shape = shape[:-1]
+        for axis_len in reversed(batch[1:]):
+            results = [results[i:i + axis_len]
+                       for i in range(0, len(results), axis_len)]
+        return Matrix._from_trusted(results, dtype, shape)
+
+    def __imatmul__(self, other):
+        """
+        __imatmul__ method for `@=`.
+        If `other` is square and result keeps dtype, result is written
+        into the matrix row by row, through one scratch row kept in it.
+        So repeated `@=` does not make new matrix on each step.
+        Float matrix is multiplied with NumPy if it is installed,
+        and the result is copied into the rows.
+        Else, it is same as `self = self @ other`.
+        """
+        if isinstance(other, LazyMatrix) or not isinstance(other, list):
+            return self @ other
+        other = other if isinstance(other, Matrix) else Matrix(other)
+        dtype = _common_dtype(self, other)
+        if dtype != self.dtype or other.ndim != 2 or self.ndim > 2\
+                or not self.shape[-1] == len(other) == len(other[0]):
+            return self @ other
+        rows = [self] if self.ndim == 1 else self
+        if dtype == 'float' and np is not None:
+            for next_row, result_row in zip(rows, _np_matmul(rows, other)):
+                next_row[:] = result_row
+            self._lu = None
+            return self
+        if dtype == 'fraction':
+            b_cols, b_scales = _scale_rows(zip(*other))
+        else:
+            b_cols = [list(x) for x in zip(*other)]
+        scratch = getattr(self, '_scratch', None)
+        if scratch is None or len(scratch) != len(b_cols):
+            scratch = self._scratch = [0] * len(b_cols)
+        for next_row in rows:
+            if dtype == 'fraction':
+                (row_ints,), (row_scale,) = _scale_rows([next_row])
+                for j, (next_col, col_scale) in enumerate(zip(b_cols,
+                                                              b_scales)):
+                    scratch[j] = Fraction(sum(map(mul, row_ints, next_col)),
+                                          row_scale * col_scale)
+            else:
+                for j, next_col in enumerate(b_cols):
+                    scratch[j] = sum(map(mul, next_row, next_col))
+            next_row[:] = scratch
+        self._lu = None
+        return self
+
+    def __mul__(self, other):
+        """
+        __mul__ method for `*`.
+        If multiply matrix with matrix, it is element-wize,
+        not matrix multiply.
+        """
+        if isinstance(other, (LazyMatrix, SparseMatrix)):
+            return NotImplemented
+        if not isinstance(other, Matrix):
+            return self._scalar_mul(other)
+        dtype = _common_dtype(self, other)
+        if self.shape != other.shape:
+            raise ValueError(
+                'Cannot multiply elementwize with different size : {} and {}'
+                .format(self.shape, other.shape))
+        return Matrix._from_trusted(
+            _map_nested(mul, self, other, self.ndim), dtype, self.shape)
+
+    def __rmul__(self, other):
+        """
+        __rmul__ method for case like int * matrix.
+        """
+        return self._scalar_mul(other)
+
+    def _scalar_mul(self, other) -> 'Matrix':
+        to_return = _map_nested(mul, self, other, self.ndim)
+        if isinstance(other, (int, float, Fraction)):
+            return Matrix._from_trusted(to_return,
+                                        _common_dtype(self, other),
+                                        self.shape)
+        return Matrix(to_return, _common_dtype(self, other))
+
+    def __imul__(self, other):
+        """
+        __imul__ method for `*=`.
+        Multiplied in place if result keeps dtype.
+        """
+        if isinstance(other, LazyMatrix):
+            return NotImplemented
+        if isinstance(other, list):
+            other = self._elementwise_operand(other, 'multiply')
+        return self._apply_inplace(mul, other, self.__mul__)
+
+    def _elementwise_operand(self, other, verb: str) -> 'Matrix':
+        if not isinstance(other, list):
+            raise ValueError("Attempt to {} matrix with {}"
+                             .format(verb, type(other).__name__))
+        other = other if isinstance(other, Matrix) else Matrix(other)
+        if self.shape != other.shape:
+            raise ValueError(
+                'Cannot {} elementwize with different size : {} and {}'
+                .format(verb, self.shape, other.shape))
+        return other
+
+    def _apply_inplace(self, func, other, fallback) -> 'Matrix':
+        """
+        Apply elementwise `func` with matrix or scalar `other`,
+        writing results into row lists of the matrix.
+        If dtype of the matrix cannot hold the results,
+        `fallback(other)` is returned instead.
+        """
+        if _common_dtype(self, other) != self.dtype:
+            return fallback(other)
+        if isinstance(other, list):
+            for next_row, other_row in zip(_leaf_rows(self, self.ndim),
+                                           _leaf_rows(other, other.ndim)):
+                next_row[:] = map(func, next_row, other_row)
+        else:
+            for next_row in _leaf_rows(self, self.ndim):
+                next_row[:] = [func(x, other) for x in next_row]
+        self._lu = None
+        return self
+
+    def __add__(self, other):
+        """
+        __add__ method for `+`. Elementwize add of same size matrixes.
+        """
+        if isinstance(other, LazyMatrix):
+            return NotImplemented
+        other = self._elementwise_operand(other, 'add')
+        return Matrix._from_trusted(_map_nested(add, self, other, self.ndim),
+                                    _common_dtype(self, other), self.shape)
+
+    def __radd__(self, other):
+        return self._elementwise_operand(other, 'add') + self
+
+    def __iadd__(self, other):
+        """
+        __iadd__ method for `+=`. Added in place if result keeps dtype.
+        """
+        if isinstance(other, LazyMatrix):
+            return NotImplemented
+        return self._apply_inplace(
+            add, self._elementwise_operand(other, 'add'), self.__add__)
+
+    def __sub__(self, other):
+        """
+        __sub__ method for `-`. Elementwize subtract of same size matrixes.
+        """
+        if isinstance(other, LazyMatrix):
+            return NotImplemented
+        other = self._elementwise_operand(other, 'subtract')
+        return Matrix._from_trusted(_map_nested(sub, self, other, self.ndim),
+                                    _common_dtype(self, other), self.shape)
+
+    def __rsub__(self, other):
+        return self._elementwise_operand(other, 'subtract') - self
+
+    def __isub__(self, other):
+        """
+        __isub__ method for `-=`. Subtracted in place if result keeps dtype.
+        """
+        if isinstance(other, LazyMatrix):
+            return NotImplemented
+        return self._apply_inplace(
+            sub, self._elementwise_operand(other, 'subtract'), self.__sub__)
+
+    def __neg__(self):
+        """
+        __neg__ method for `-`.
+        """
+        return self._scalar_mul(-1)
+
+    def __pow__(self, k: int, mod: Optional[int] = None):
+        """
+        __pow__ method for `**` and `pow`. See `matrix_power`.
+        """
+        if not isinstance(k, int):
+            return NotImplemented
+        return self.matrix_power(k, mod)
+
+    def matrix_power(self, k: int, mod: Optional[int] = None) -> 'Matrix':
+        """
+        Raise square matrix to integer power,
+        using exponentiation by squaring.
+        Squares and products are written into two working matrixes
+        with `@=`, so only O(log k) multiplies are done.
+
+        Parameters
+        ----------
+        k
+            Power. If negative, power of inverse matrix is calculated.
+        mod
+            If given, every element is calculated modulo `mod`,
+            so elements do not grow for huge `k`.
+            Fraction element is taken as numerator times modular inverse
+            of denominator. Result is int matrix.
+
+        Raises
+        ------
+        ValueError
+            If matrix is not square, `mod` is not positive,
+            `mod` is given for float matrix,
+            or denominator has no inverse modulo `mod`.
+        ZeroDivisionError
+            If `k` is negative and matrix has no inverse.
+
+        Returns
+        -------
+        Matrix
+            `k`th power of the matrix.
+
+        Examples
+        --------
+        >>> a = Matrix([[1,1],[1,0]])
+        >>> print(a ** 10)
+        [[89 55]
+         [55 34]]
+        >>> print(a ** -2)
+        [[ 1 -1]
+         [-1  2]]
+        >>> print(pow(a, 10**18, 1000000007))
+        [[680057396 209783453]
+         [209783453 470273943]]
+        """
+        if self.ndim != 2 or len(self) != len(self[0]):
+            raise ValueError(
+                'Matrix must be square to get power,'
+                ' but given matrix is {}'
+                .format('*'.join(str(x) for x in self.shape)))
+        if mod is not None and (self.dtype == 'float' or mod < 1):
+            raise ValueError('Modulus must be positive and used with '
+                             'exact matrix, but {} given for {} matrix'
+                             .format(mod, self.dtype))
+        base = self
+        if k < 0:
+            base = ~self
+            k = -k
+        size = len(self)
+        if mod is not None:
+            base = [[x.numerator * pow(x.denominator, -1, mod) % mod
+                     if isinstance(x, Fraction) else x % mod
+                     for x in next_row] for next_row in base]
+            to_return = [[int(i == j) % mod for j in range(size)]
+                         for i in range(size)]
+            while k:
+                if k & 1:
+                    to_return = _mod_matmul(to_return, base, mod)
+                k >>= 1
+                if k:
+                    base = _mod_matmul(base, base, mod)
+            return Matrix._from_trusted(to_return, 'int', (size, size))
+
+        if k == 0:
+            return Matrix.unit_mat(size, base.dtype)
+        to_return = None
+        base = base.copy()
+        while True:
+            if k & 1:
+                if to_return is None:
+                    to_return = base.copy()
+                else:
+                    to_return @= base
+            k >>= 1
+            if not k:
+                return to_return
+            base @= base
+
+    def __invert__(self):
+        """
+        __invert__ method for `~`.
+        Return inverse matrix.
+
+        Raises
+        ------
+        ZeroDivisionError
+            If there is no inverse matrix.
+        """
+        return self.lu().inverse()
+
+    def gauss_elim(self, second: Optional['Matrix'] = None,
+                   step_by_step: bool = False,
+                   trace: Optional[TraceSink] = None) -> 'Matrix':
+        """
+        Calculate with gauss elimination.
+        Returns right-side matrix after calculation.
+
+        Parameters
+        ----------
+        second
+            Right-side matrix. can be 1D or 2D.
+            If not given, this method calculates inverse matrix.
+        step_by_step
+            If true, print step by step solution.
+            If false, cached PLU factorization is used. See `lu`.
+        trace
+            If given, step by step solution is sent to it
+            instead of being printed.
+
+        Raises
+        ------
+        ValueError
+            If self is not square matrix, or length is different.
+        ZeroDivisionError
+            If cannot calculate due to divide with zero.
+            It happens when determinent of self is zero.
+
+        Returns
+        -------
+        Matrix
+            Result of gauss elimination calculation.
+
+        Examples
+        --------
+        Example of using gauss_elim with no option:
+
+        >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
+        >>> print(a.gauss_elim())
+        [[-40 16  9]
+         [ 13 -5 -3]
+         [  5 -2 -1]]
+
+        Example of using gauss_elim with option:
+
+        >>> b = Matrix([[1,0,0],[0,1,0],[0,0,1]])
+        >>> print(a.gauss_elim(b))
+        [[-40 16  9]
+         [ 13 -5 -3]
+         [  5 -2 -1]]
+
+        Example of using step by step solution:
+
+        >>> a.gauss_elim(step_by_step=True) #doctest: +ELLIPSIS
+        1 2 3 | 1 0 0
+        2 5 3 | 0 1 0
+        1 0 8 | 0 0 1
+        Add row 1 * -2 to row 2
+        ...
+
+        """
+
+        def emit_state():
+            sink.emit(Step('state', snapshot=(first, second)))
+
+        def change_row(src, dest):
+            if src != dest:
+                sink.emit(Step('swap', (src, dest)))
+                first[src], first[dest], second[src], second[dest] =\
+                    first[dest], first[src], second[dest], second[src]
+                emit_state()
+
+        def div_row(row, num):
+            sink.emit(Step('divide', (row,), num))
+            try:
+                for next_row in (first[row], second[row]):
+                    for k, x in enumerate(next_row):
+                        next_row[k] = x / num
+            except ZeroDivisionError as e:
+                raise _zero_division_error(e)
+            emit_state()
+
+        def add_row(src, dest, to_mul):
+            sink.emit(Step('add', (src, dest), to_mul))
+            for dest_row, src_row in ((first[dest], first[src]),
+                                      (second[dest], second[src])):
+                for k, y in enumerate(src_row):
+                    if y != 0:
+                        dest_row[k] += y * to_mul
+            emit_state()
+
+        dtype = 'float' if self.dtype == 'float' else 'fraction'
+        if second is None:
+            second = Matrix.unit_mat(len(self), dtype)
+        else:
+            second = Matrix(second, dtype)
+        if not isinstance(second[0], list):
+            second = second.T
+        if len(self) != len(self[0]):
+            raise ValueError(
+                'Matrix must be square to use Gauss elimination,'
+                ' but given matrix is {}*{}'
+                .format(len(self), len(self[0])))
+        if len(self) != len(second):
+            raise ValueError(
+                'Length of argument is {}, while length of given matrix is {}'
+                .format(len(second), len(self)))
+        sink = _trace_sink(step_by_step, trace)
+        if sink is None:
+            return self.lu().solve_many(second)
+
+        first = Matrix(self, dtype)
+        emit_state()
+        for i, next_row in enumerate(first):
+            if next_row[i] != 1:
+                found = False
+                non_zero = i
+                for j in range(len(first) - i):
+                    if first[j + i][i] == 1:
+                        found = True
+                        change_row(i, j + i)
+                    elif next_row[i] == 0 and first[j + i][i] != 0\
+                         and non_zero == i:
+                        non_zero = j + i
+                if not found:
+                    change_row(i, non_zero)
+                    div_row(i, first[i][i])
+
+            for j in range(len(first) - i - 1):
+                if first[j + i + 1][i] == 0:
+                    continue
+                add_row(i, j + i + 1, -first[j + i + 1][i])
+
+        for i in range(len(first) - 1, -1, -1):
+            if first[i][i] != 1:
+                found = False
+                for j in range(len(first) - i):
+                    if first[j + i][i] == 1:
+                        found = True
+                        change_row(i, j + i)
+                    elif first[i][i] == 0 and first[j + i][i] != 0\
+                         and non_zero == i:
+                        non_zero = j + i
+                if not found:
+                    change_row(i, non_zero)
+                    div_row(i, first[i][i])
+
+            for j in range(i - 1, -1, -1):
+                if first[j][i] == 0:
+                    continue
+                add_row(i, j, -first[j][i])
+
+        return Matrix._from_trusted(second, dtype)
+
+    def inv_using_det(self, step_by_step: bool = False,
+                      cache: Optional[MinorCache] = None,
+                      trace: Optional[TraceSink] = None,
+                      workers: Optional[int] = None,
+                      executor: Optional[Executor] = None) -> 'Matrix':
+        """
+        Get inverse matrix using determinent.
+
+        Parameters
+        ----------
+        step_by_step
+            If True, print step by step solution
+        cache
+            Minor cache of this matrix to use. If not given, new one is used.
+        trace
+            If given, step by step solution is sent to it
+            instead of being printed.
+        workers
+            If given, cofactors are calculated in a pool of
+            this many processes. See `MinorCache.minors`.
+        executor
+            If given, it is used as the pool instead.
+
+        Raises
+        ------
+        ZeroDivisionError
+            If there is no inverse matrix.
+        ValueError
+            If matrix is not square.
+
+        Returns
+        -------
+        Matrix
+            calculated inverse matrix
+
+        Examples
+        --------
+        Example of using inv_using_det:
+
+        >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
+        >>> print(a.inv_using_det())
+        [[-40 16  9]
+         [ 13 -5 -3]
+         [  5 -2 -1]]
+
+        Example of calculating cofactors in process pool:
+
+        >>> a.inv_using_det(workers=2) == a.inv_using_det()
+        True
+
+        Example of using step by step solution:
+
+        >>> a.inv_using_det(step_by_step=True) #doctest:+ELLIPSIS
+        Get adjugate matrix before transpose
+        [[ 40 -13 -5]
+         [-16   5  2]
+         [ -9   3  1]]
+        Transpose it
+        ...
+
+        """
+
+        if len(self) != len(self[0]):
+            raise ValueError(
+                'Matrix must be square to get inverse, '
+                'but given matrix is {}*{}'
+                .format(len(self), len(self[0])))
+        sink = _trace_sink(step_by_step, trace)
+        cache = self._minor_cache(cache)
+        size = len(self)
+        minors = iter(cache.minors([(1 << i, 1 << j) for i in range(size)
+                                    for j in range(size)],
+                                   workers, executor))
+        to_return = Matrix._from_trusted(
+            [[next(minors) * ((-1)**(i + j)) for j in range(size)]
+             for i in range(size)],
+            'int' if self.dtype == 'int' else 'fraction')
+        if sink:
+            sink.emit(Step('adjugate', snapshot=to_return))
+        to_return = to_return.T
+        if sink:
+            sink.emit(Step('transpose', snapshot=to_return))
+        det_dest = sum(self[0][j] * to_return[j][0]
+                       for j in range(len(self)))
+        if self.dtype == 'int':
+            det_dest = Fraction(det_dest)
+        if sink:
+            sink.emit(Step('inverse_det'))
+            self.det_step_by_step(cache, sink)
+            sink.emit(Step('divide_all', scalar=det_dest))
+        try:
+            to_return = Matrix._from_trusted(
+                [[x / det_dest for x in k] for k in to_return],
+                'float' if self.dtype == 'float' else 'fraction')
+            if sink:
+                sink.emit(Step('matrix', snapshot=to_return))
+            return to_return
+        except ZeroDivisionError as e:
+            raise _zero_division_error(e)
+
+    def cramer(self, vals: Tuple[Union[int, float, Fraction], ...],
+               step_by_step: bool = False,
+               cache: Optional[MinorCache] = None,
+               trace: Optional[TraceSink] = None,
+               workers: Optional[int] = None,
+               executor: Optional[Executor] = None) -> Tuple[Fraction, ...]:
+        """
+        Calculate polinomial linear expression using Cramer's formular.
+
+        Parameters
+        ----------
+        vals
+            Right-sided value to calculate.
+        step_by_step
+            If true, print step by step solution.
+        cache
+            Minor cache of this matrix to use. If not given, new one is used.
+            Without step by step solution, cached PLU factorization
+            is used instead of determinants.
+        trace
+            If given, step by step solution is sent to it
+            instead of being printed.
+        workers
+            If given, determinants are calculated with Bareiss algorithm
+            in a pool of this many processes, instead of PLU factorization.
+            Not used with step by step solution.
+        executor
+            If given, it is used as the pool instead.
+
+        Raises
+        ------
+        ZeroDivisionError
+            If polinomial linear expression cannot be solved.
+        ValueError
+            If matrix is not square.
+
+        Returns
+        -------
+        tuple
+           Roots calculated. Type is Fraction.
+
+        Examples
+        --------
+        Example of using cramer:
+
+        >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
+        >>> res = a.cramer((5, 2, 1))
+        >>> print(tuple(int(x) for x in res))
+        (-159, 52, 20)
+        >>> a.cramer((5, 2, 1), workers=2) == res
+        True
+
+        Example of using cramer with step by step solution:
+
+        >>> a.cramer((5, 2, 1), step_by_step=True) #doctest:+ELLIPSIS
+        Find Determinant of given matrix.
+        Determinant of
+        [[1 2 3]
+         [2 5 3]
+         [1 0 8]]
+        is 40 - 26 + -15 = -1
+        ...
+
+        """
+
+        if not len(self) == len(self[0]) == len(vals):
+            raise ValueError(
+                'Matrix must be square and have same size as numbers'
+                " to use Cramer's formular,"
+                ' but {}*{} matrix given with {} numbers.'
+                .format(len(self), len(self[0]), len(vals)))
+
+        if isinstance(vals, list):
+            vals = tuple(vals)
+        sink = _trace_sink(step_by_step, trace)
+        if sink is None and (workers or executor):
+            size = len(vals)
+            rows = tuple(range(size))
+            tasks = [(rows, rows)] + [
+                (rows, rows[:i] + (size,) + rows[i + 1:]) for i in rows]
+            mat_det, *dets = _parallel_dets(
+                [list(next_row) + [x] for next_row, x in zip(self, vals)],
+                tasks, workers, executor)
+            if mat_det == 0:
+                if self.dtype == 'float':
+                    raise ZeroDivisionError(
+                        "Error : Attempt to divide with 0.")
+                raise _singular_error(dets[0])
+            convert = float if self.dtype == 'float' else Fraction
+            return tuple(convert(x / mat_det) for x in dets)
+        if sink is None:
+            lu = self.lu()
+            if not lu.regular and self.dtype != 'float':
+                # Same error as step by step solution, which fails
+                # dividing determinant for first variable
+                next_mat = Matrix(self)
+                for next_row, x in zip(next_mat, vals):
+                    next_row[0] = x
+                raise _singular_error(next_mat.determinant())
+            return tuple(lu.solve(vals))
+        cache = self._minor_cache(cache)
+        to_return = tuple()
+        sink.emit(Step('cramer_det'))
+        mat_det = self.det_step_by_step(cache, sink)
+        for i in range(len(self[0])):
+            next_mat = Matrix(self, 'float' if self.dtype == 'float'
+                              else 'fraction')
+            for j in range(len(self)):
+                next_mat[j][i] = vals[j]
+            sink.emit(Step('cramer_variable', (i,)))
+            next_det = next_mat.det_step_by_step(trace=sink)
+            if self.dtype == 'int':
+                next_det = Fraction(next_det)
+            try:
+                next_root = next_det / mat_det
+            except ZeroDivisionError as e:
+                raise _zero_division_error(e)
+            sink.emit(Step('cramer_divide', scalar=next_root,
+                           values=(next_det, mat_det)))
+            to_return += (next_root,)
+
+        return to_return
+
+    def get_cofactor(self, i_selected: int, j_selected: int) -> 'Matrix':
+        """
+        Get cofactor with given index. Index starts with 0.
+
+        Parameters
+        ----------
+        i_selected
+            Row index to get cofactor.
+        j_selected
+            Colomn index to get coffactor.
+
+        Returns
+        -------
+        Matrix
+            Cofactor calculated.
+        """
+        to_return = self[:]
+        del to_return[i_selected]
+        for i, next_row in enumerate(to_return):
+            to_return[i] = [next_elem for j, next_elem in enumerate(next_row)
+                            if j != j_selected]
+        return Matrix._from_trusted(to_return, self.dtype,
+                                    (len(self) - 1, len(self[0]) - 1))
+
+    def mat_input(self) -> None:
+        """
+        User input for matrix.
+
+        Raises
+        ------
+        ValueError
+            Raise if unappropriate value is given.
+        """
+        print("Input matrix. press enter key two time for exit."
+              "\nElement is seperated with space.")
+        while True:
+            inputed = input().split()
+            if not inputed:
+                break
+            self.append(_parse_row(inputed, self.dtype))
+
+    @classmethod
+    def from_text(cls, stream, dtype: str = 'fraction',
+                  delimiter: Optional[str] = None,
+                  chunk_size: int = 1 << 20) -> 'Matrix':
+        """
+        Read 2D matrix from text stream, one row in each line.
+        Stream is read in chunks, and each line is converted
+        when it is read, so whole text is never kept.
+        Blank lines are skipped.
+        Use `PackedMatrix.from_text` to keep exact elements in
+        compact storage instead of nested list.
+
+        Parameters
+        ----------
+        stream
+            Text stream, like opened file or sys.stdin.
+        dtype
+            'fraction', 'int' or 'float'.
+        delimiter
+            String between elements. If None, any whitespace is used.
+        chunk_size
+            Number of characters read at a time.
+
+        Raises
+        ------
+        ValueError
+            If element is not a number, or rows have different lengths.
+
+        Returns
+        -------
+        Matrix
+            Read matrix.
+
+        Examples
+        --------
+        >>> from io import StringIO
+        >>> print(Matrix.from_text(StringIO("1  2 3/4\\n-5 0.5 6\\n")))
+        [[ 1   2 3/4]
+         [-5 1/2   6]]
+        """
+        if dtype not in _CONVERTERS:
+            raise ValueError('Unknown dtype : {}'.format(dtype))
+        rows = [_parse_row(tokens, dtype)
+                for tokens in _text_rows(stream, delimiter, chunk_size)]
+        if not rows:
+            return cls(dtype=dtype)
+        return cls._from_trusted(rows, dtype, (len(rows), len(rows[0])))
+
+    @classmethod
+    def from_csv(cls, path: str, dtype: str = 'fraction',
+                 delimiter: str = ',') -> 'Matrix':
+        """
+        Read 2D matrix from CSV file of numbers. See `from_text`.
+
+        Parameters
+        ----------
+        path
+            Path of file.
+        dtype
+            'fraction', 'int' or 'float'.
+        delimiter
+            String between elements.
+
+        Raises
+        ------
+        ValueError
+            If element is not a number, or rows have different lengths.
+
+        Returns
+        -------
+        Matrix
+            Read matrix.
+        """
+        with open(path, newline='') as f:
+            return cls.from_text(f, dtype, delimiter)
+
+    def to_bytes(self, encoding: Optional[str] = None) -> bytes:
+        """
+        Serialize matrix into compact binary format.
+        Data has header with format version, dtype, encoding and shape,
+        and then elements in row-major order.
+        Fraction is stored as array of numerators and array of denominators.
+
+        Parameters
+        ----------
+        encoding
+            'fixed' for little-endian int64 or float64,
+            which can be loaded without parsing each element.
+            'variable' for ints of any size, each with its length in bytes.
+            If not given, 'fixed' is used if every value fits in it.
+
+        Raises
+        ------
+        ValueError
+            If encoding is unknown, or float matrix has 'variable' encoding.
+        OverflowError
+            If 'fixed' encoding is given, but value does not fit in int64.
+
+        Returns
+        -------
+        bytes
+            Serialized matrix. See `from_bytes`.
+
+        Examples
+        --------
+        >>> a = Matrix([[1,Fraction(1,2)],[-3,4]])
+        >>> len(a.to_bytes())
+        88
+        >>> print(Matrix.from_bytes(a.to_bytes('variable')))
+        [[ 1 1/2]
+         [-3   4]]
+        """
+        if encoding not in (None, 'fixed', 'variable'):
+            raise ValueError('Unknown encoding : {}'.format(encoding))
+        mat = Matrix(self, self.dtype)
+        shape = mat.shape
+        flat = [x for next_row in _leaf_rows(mat, len(shape))
+                for x in next_row]
+        if mat.dtype == 'float':
+            if encoding == 'variable':
+                raise ValueError('Float matrix can only use fixed encoding')
+            arrays = [flat]
+        elif mat.dtype == 'fraction':
+            arrays = [[x.numerator for x in flat],
+                      [x.denominator for x in flat]]
+        else:
+            arrays = [flat]
+        if encoding is None:
+            try:
+                body = b''.join(_fixed_bytes(mat.dtype, x) for x in arrays)
+                encoding = 'fixed'
+            except OverflowError:
+                encoding = 'variable'
+        elif encoding == 'fixed':
+            try:
+                body = b''.join(_fixed_bytes(mat.dtype, x) for x in arrays)
+            except OverflowError:
+                raise OverflowError('Elements do not fit in int64,'
+                                    ' use variable encoding')
+        if encoding == 'variable':
+            body = b''.join(_variable_bytes(x) for x in arrays)
+        return _MATRIX_HEADER.pack(
+            _MATRIX_MAGIC, _MATRIX_VERSION, _DTYPE_CODES[mat.dtype],
+            _ENCODING_CODES[encoding], len(shape))\
+            + struct.pack('<{}q'.format(len(shape)), *shape) + body
+
+    @classmethod
+    def from_bytes(cls, data) -> 'Matrix':
+        """
+        Load matrix serialized by `to_bytes`.
+        Fixed width data is read through memoryview,
+        without parsing each element.
+
+        Parameters
+        ----------
+        data
+            bytes, bytearray, memoryview, mmap or other buffer.
+
+        Raises
+        ------
+        ValueError
+            If data is not serialized matrix, or is truncated.
+
+        Returns
+        -------
+        Matrix
+            Loaded matrix.
+        """
+        with memoryview(data) as whole, whole.cast('B') as view:
+            if len(view) < _MATRIX_HEADER.size:
+                raise ValueError('Matrix data is truncated')
+            magic, version, dtype_code, encoding_code, ndim =\
+                _MATRIX_HEADER.unpack_from(view)
+            if magic != _MATRIX_MAGIC:
+                raise ValueError('Data is not serialized matrix')
+            if version != _MATRIX_VERSION:
+                raise ValueError('Unsupported format version : {}'
+                                 .format(version))
+            dtype = _DTYPE_NAMES.get(dtype_code)
+            fixed = encoding_code == _ENCODING_CODES['fixed']
+            if dtype is None or not fixed and\
+                    encoding_code != _ENCODING_CODES['variable']:
+                raise ValueError('Data is not serialized matrix')
+            offset = _MATRIX_HEADER.size + 8 * ndim
+            if len(view) < offset:
+                raise ValueError('Matrix data is truncated')
+            shape = struct.unpack_from('<{}q'.format(ndim), view,
+                                       _MATRIX_HEADER.size)
+            count = 1
+            for next_len in shape:
+                count *= next_len
+            read = _read_fixed if fixed else _read_variable
+            flat, offset = read(view, dtype, offset, count)
+            if dtype == 'fraction':
+                denominators, offset = read(view, dtype, offset, count)
+                flat = [Fraction(x) if y == 1 else Fraction(x, y)
+                        for x, y in zip(flat, denominators)]
+        for next_len in reversed(shape[1:]):
+            flat = [flat[i:i + next_len]
+                    for i in range(0, len(flat), next_len)]
+        return cls._from_trusted(flat, dtype, shape)
+
+    def save(self, path: str, encoding: Optional[str] = None) -> None:
+        """
+        Save matrix into file. See `to_bytes`.
+
+        Parameters
+        ----------
+        path
+            Path of file.
+        encoding
+            'fixed' or 'variable'. See `to_bytes`.
+        """
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes(encoding))
+
+    @classmethod
+    def load(cls, path: str) -> 'Matrix':
+        """
+        Load matrix saved by `save`.
+        File is memory-mapped, so fixed width data is not copied
+        before elements are made.
+
+        Parameters
+        ----------
+        path
+            Path of file.
+
+        Raises
+        ------
+        ValueError
+            If file is not saved matrix.
+
+        Returns
+        -------
+        Matrix
+            Loaded matrix.
+        """
+        with open(path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise ValueError('Matrix data is truncated')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return cls.from_bytes(data)
+
+    def lazy(self) -> 'LazyMatrix':
+        """
+        Start lazy expression with the matrix. See `LazyMatrix`.
+
+        Raises
+        ------
+        ValueError
+            If matrix is not 2D.
+
+        Returns
+        -------
+        LazyMatrix
+            Expression of the matrix itself.
+        """
+        return LazyMatrix(self)
+
+    def lu(self) -> 'LUDecomposition':
+        """
+        Get PLU factorization of the matrix.
+        Factorization is kept in the matrix, and made again
+        only when elements of the matrix are changed.
+
+        Raises
+        ------
+        ValueError
+            If matrix is not square.
+
+        Returns
+        -------
+        LUDecomposition
+            Factorization of the matrix.
+        """
+        key = tuple(tuple(next_row) for next_row in self)
+        if self._lu is None or self._lu[0] != key:
+            self._lu = (key, LUDecomposition(
+                self, 'float' if self.dtype == 'float' else 'fraction'))
+        return self._lu[1]
+
+    @classmethod
+    def solve_batch(cls, As: Iterable[list], Bs: Iterable[list],
+                    method: str = 'gauss') -> BatchResult:
+        """
+        Solve many independent linear systems `As[i] @ X == Bs[i]`.
+        Singular or wrong-shaped system does not stop the batch,
+        and is reported in status instead.
+
+        Parameters
+        ----------
+        As
+            Square matrixes of each system. Sizes can differ.
+        Bs
+            Right sides of each system. Can be 1D or 2D.
+        method
+            'gauss' for exact roots as Matrix in same shape as right side.
+            'cramer' for exact roots as tuple, like `cramer`.
+            Right side of it must be 1D.
+            Both are calculated with fraction-free elimination.
+            'float' for float roots. Systems of same shape are solved
+            together with NumPy if it is installed.
+
+        Raises
+        ------
+        ValueError
+            If method is unknown, or As and Bs have different length.
+
+        Returns
+        -------
+        BatchResult
+            Roots and status of each system.
+
+        Examples
+        --------
+        >>> res = Matrix.solve_batch([[[1, 2], [3, 4]], [[1, 2], [2, 4]]],
+        ...                          [[5, 6], [1, 2]], method='cramer')
+        >>> res.status
+        ['ok', 'singular']
+        >>> print(*res.solutions[0])
+        -4 9/2
+        """
+        if method not in ('gauss', 'cramer', 'float'):
+            raise ValueError('Unknown method : {}'.format(method))
+        As, Bs = list(As), list(Bs)
+        if len(As) != len(Bs):
+            raise ValueError('{} matrixes given with {} right sides.'
+                             .format(len(As), len(Bs)))
+        solutions = [None] * len(As)
+        status = ['invalid'] * len(As)
+        groups = {}
+        for index, (a, b) in enumerate(zip(As, Bs)):
+            try:
+                a_shape, b_shape = _nested_shape(a), _nested_shape(b)
+            except (ValueError, TypeError):
+                continue
+            if len(a_shape) != 2 or a_shape[0] != a_shape[1]\
+                    or b_shape[0] != a_shape[0] or len(b_shape) > 2\
+                    or (method == 'cramer' and len(b_shape) != 1):
+                continue
+            groups.setdefault(a_shape + b_shape[1:], []).append(index)
+
+        for shape, indexes in groups.items():
+            if method == 'float':
+                roots = _float_solve_batch([As[i] for i in indexes],
+                                           [Bs[i] for i in indexes])
+            else:
+                roots = []
+                for i in indexes:
+                    b = Bs[i] if len(shape) == 3 else [[x] for x in Bs[i]]
+                    roots.append(_bareiss_solve(As[i], b))
+            dtype = 'float' if method == 'float' else 'fraction'
+            for i, next_roots in zip(indexes, roots):
+                if next_roots is None:
+                    status[i] = 'singular'
+                    continue
+                status[i] = 'ok'
+                if len(shape) == 3:
+                    solutions[i] = cls._from_trusted(next_roots, dtype,
+                                                     shape[1:])
+                elif method == 'cramer':
+                    solutions[i] = tuple(x for x, in next_roots)
+                else:
+                    solutions[i] = cls._from_trusted(
+                        [x for x, in next_roots], dtype, shape[1:2])
+        return BatchResult(solutions, status)
+
+    def det_step_by_step(self, cache: Optional[MinorCache] = None,
+                         trace: Optional[TraceSink] = None) -> Fraction:
+        """
+        Calculate determinant with printing step by step solution.
+
+        Parameters
+        ----------
+        cache
+            Minor cache of this matrix to use. If not given, new one is used.
+        trace
+            If given, step by step solution is sent to it
+            instead of being printed.
+
+        Raises
+        ------
+        ValueError
+            If matrix is not square.
+
+        Returns
+        -------
+        Fraction
+            calculated determinant. int for int matrix.
+        """
+        if len(self) != len(self[0]):
+            raise ValueError('Matrix must be square to get determinant,'
+                             ' but given matrix is {}*{}'
+                             .format(len(self), len(self[0])))
+        sink = _trace_sink(True, trace)
+        if len(self) == 1:
+            return self[0][0]
+        if len(self) == 2:
+            to_return = self[0][0] * self[1][1] - self[0][1] * self[1][0]
+            sink.emit(Step('det', scalar=to_return, snapshot=self))
+            return to_return
+
+        cache = self._minor_cache(cache)
+        to_return = 0
+        terms = []
+        for i in range(len(self)):
+            term = self[0][i] * cache.minor(1, 1 << i)
+            terms.append(term)
+            to_return += term * ((-1)**i)
+        sink.emit(Step('det', scalar=to_return, snapshot=self,
+                       values=tuple(terms)))
+        return to_return
+
+    @classmethod
+    def mul_stepbystep(cls, first: 'Matrix', second: 'Matrix',
+                       trace: Optional[TraceSink] = None) -> 'Matrix':
+        """
+        Multiply matrix with printing step by step solution.
+        Calculates `first @ second`.
+
+        Parameters
+        ----------
+        first
+            Matrix to calculate with.
+        second
+            Matrix to calculate with.
+        trace
+            If given, step by step solution is sent to it
+            instead of being printed.
+
+        Raises
+        ------
+        ValueError
+            If matrixes cannot be multiplied.
+
+        Returns
+        -------
+        Matrix
+            Calculated matrix.
+        """
+        if len(first[0]) != len(second):
+            raise ValueError(
+                'Attempt to multiply {}*{} matrix with {}*{} matrix'
+                .format(len(first), len(first[0]),
+                        len(second), len(second[0])))
+        sink = _trace_sink(True, trace)
+        dtype = _common_dtype(first, second)
+        first = first if isinstance(first, Matrix) else Matrix(first)
+        second = second if isinstance(second, Matrix) else Matrix(second)
+        to_return = []
+        for i, row_first in enumerate(first):
+            to_return.append([])
+            products = []
+            for j in range(len(second[0])):
+                to_return[i].append(0)
+                pairs = tuple((row_first[k], second[k][j])
+                              for k in range(len(first[0])))
+                for x, y in pairs:
+                    to_return[i][j] += x * y
+                products.append(pairs)
+            sink.emit(Step('mul_row', (i,), values=tuple(products)))
+        return Matrix._from_trusted(to_return, dtype,
+                                    (len(to_return), len(second[0])))
+
+    @classmethod
+    def unit_mat(cls, size: int, dtype: str = 'fraction') -> 'Matrix':
+        """
+        Get unit matrix of given size.
+
+        Parameters
+        ----------
+        size
+            Size of unit matrix.
+        dtype
+            Type of elements.
+
+        Returns
+        -------
+        Matrix
+            Calculated unit matrix.
+        """
+        one, zero = _CONVERTERS[dtype](1), _CONVERTERS[dtype](0)
+        to_return = []
+        for i in range(size):
+            to_return.append([])
+            for j in range(size):
+                if i == j:
+                    to_return[i].append(one)
+                else:
+                    to_return[i].append(zero)
+        return cls._from_trusted(to_return, dtype, (size, size))
+
+    def determinant(self, method: str = 'bareiss',
+                    cache: Optional[MinorCache] = None) -> Fraction:
+        """
+        Calculate determinant with given method.
+
+        Parameters
+        ----------
+        method
+            'bareiss' for fraction-free elimination, which takes O(n^3).
+            'cofactor' for cofactor expansion along first row.
+            Same as `det_step_by_step`, without printing.
+            'modular' for elimination modulo word-size primes, joined by
+            Chinese remainder theorem. Numbers do not grow while
+            eliminating. Not for float matrix.
+        cache
+            Minor cache of this matrix to use. If not given, new one is used.
+
+        Raises
+        ------
+        ValueError
+            If matrix is not square, or method is unknown
+            or is 'modular' for float matrix.
+
+        Returns
+        -------
+        Fraction
+            calculated determinant. int for int matrix,
+            and float for float matrix.
+
+        Examples
+        --------
+        >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
+        >>> print(a.determinant())
+        -1
+        >>> Matrix(a, 'int').determinant()
+        -1
+        >>> print(a.determinant(method='cofactor'))
+        -1
+        >>> print(a.determinant(method='modular'))
+        -1
+        """
+        if len(self) != len(self[0]):
+            raise ValueError(
+                'Matrix must be square to get determinant,'
+                ' but given matrix is {}*{}'
+                .format(len(self), len(self[0])))
+        if method not in ('bareiss', 'cofactor', 'modular'):
+            raise ValueError('Unknown method for determinant : {}'
+                             .format(method))
+        if method == 'modular':
+            if self.dtype == 'float':
+                raise ValueError('Modular determinant needs exact matrix,'
+                                 ' but float matrix given')
+            rows, scale = _integerize_rows(self)
+            if self.dtype == 'int':
+                return _modular_det(rows)
+            return Fraction(_modular_det(rows), scale)
+        if self.dtype == 'float' and method == 'bareiss':
+            if np is not None:
+                return float(np.linalg.det(np.array(self, dtype=float)))
+            return _float_det([list(next_row) for next_row in self])
+        return self._minor_cache(cache).minor(method=method)
+
+    def rank(self) -> int:
+        """
+        Calculate exact rank with elimination modulo primes.
+        Float elements are taken as their exact values.
+
+        Raises
+        ------
+        ValueError
+            If matrix is not 2D.
+
+        Returns
+        -------
+        int
+            Rank of the matrix.
+
+        Examples
+        --------
+        >>> Matrix([[1,2,3],[2,4,6],[1,0,1]]).rank()
+        2
+        """
+        if self.ndim != 2:
+            raise ValueError('Matrix must be 2D to get rank,'
+                             ' but {}D matrix given'.format(self.ndim))
+        return _modular_rank(_integerize_rows(self)[0])
+
+    def is_singular(self) -> bool:
+        """
+        Check if determinant is exactly zero, with elimination modulo
+        primes. Stops at first prime where determinant is not zero.
+        Float elements are taken as their exact values.
+
+        Raises
+        ------
+        ValueError
+            If matrix is not square.
+
+        Returns
+        -------
+        bool
+            True if the matrix has no inverse.
+
+        Examples
+        --------
+        >>> Matrix([[1,2],[2,4]]).is_singular()
+        True
+        """
+        if self.ndim != 2 or len(self) != len(self[0]):
+            raise ValueError('Matrix must be square to check singular,'
+                             ' but given matrix is {}'
+                             .format('*'.join(str(x) for x in self.shape)))
+        rows, _ = _integerize_rows(self)
+        bound_square = _hadamard_square(rows)
+        modulus = 1
+        for prime in _modular_primes():
+            if _mod_eliminate(rows, prime)[1]:
+                return False
+            modulus *= prime
+            if modulus * modulus > bound_square:
+                return True
+
+    def _minor_cache(self, cache: Optional[MinorCache]) -> MinorCache:
+        if cache is None:
+            return MinorCache(self)
+        if cache.mat is not self:
+            raise ValueError('Given cache is made for other matrix')
+        return cache
+
+    @property
+    def det(self) -> Fraction:
+        """
+        Fraction: Determinant of the matrix. int for int matrix.
+        Calculated with fraction-free Bareiss elimination.
+        """
+        return self.determinant()
+
+    @property
+    def T(self) -> 'Matrix':
+        """
+        Matrix: Transposed matrix.
+        """
+        shape = self.shape
+        if len(shape) == 1:
+            return Matrix._from_trusted([[x] for x in self], self.dtype,
+                                        shape + (1,))
+        to_return = [list(x) for x in zip(*self)]
+        if len(shape) > 2:
+            to_return = _copy_nested(to_return)
+        return Matrix._from_trusted(to_return, self.dtype,
+                                    (shape[1], shape[0]) + shape[2:])
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """
+        Tuple of int: Shape of the matrix.
+        """
+        if self._shape is None:
+            self._shape = _trusted_shape(self)
+        return self._shape
+
+    @property
+    def ndim(self) -> int:
+        """
+        int: Number of dimensions of the matrix.
+        """
+        return len(self.shape)
+
+
+def _pack_ints(values: list) -> Union[array, List[int]]:
+    """
+    Store ints in array of int64 if all of them fit, else in list.
+    """
+    try:
+        return array('q', values)
+    except OverflowError:
+        return list(values)
+
+
+class LUDecomposition:
+    """
+    PLU factorization of square matrix.
+    Row `perm[i]` of the matrix is row i of `L @ U`, and L and U are kept
+    in one table.
+
+    Exact factorization scales every row to integers and uses
+    fraction-free Bareiss elimination, keeping its multipliers as L.
+    Right sides are eliminated with same multipliers and solved by
+    fraction-free back substitution, so only the results are Fraction.
 
     Parameters
     ----------
-    arg
-        If given, initialize with given list.
-        Else, initialize with blank list.
+    mat
+        Square matrix to factorize.
+    dtype
+        'fraction' for exact factorization.
+        'float' for floating point with partial pivoting,
+        which uses NumPy if it is installed.
+
+    Raises
+    ------
+    ValueError
+        If matrix is not square.
+
+    Examples
+    --------
+    >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
+    >>> lu = a.lu()
+    >>> print(lu.det)
+    -1
+    >>> print(*lu.solve([5, 2, 1]))
+    -159 52 20
+    >>> print(lu.solve_many([[5, 1], [2, 0], [1, 0]]))
+    [[-159 -40]
+     [  52  13]
+     [  20   5]]
     """
-    def __init__(self, arg: Optional[list] = None):
-        def recurse_fractionalize(mat):
-            if not isinstance(mat[0], list):
-                return [Fraction(x) for x in mat]
-            return [recurse_fractionalize(x) for x in mat]
+    def __init__(self, mat: list, dtype: str = 'fraction'):
+        if len(mat) != len(mat[0]):
+            raise ValueError('Matrix must be square to factorize,'
+                             ' but given matrix is {}*{}'
+                             .format(len(mat), len(mat[0])))
+        self.dtype = dtype
+        size = len(mat)
+        self.perm = list(range(size))
+        self.sign = 1
+        if dtype != 'float':
+            self.table, self.scales = _scale_rows(mat)
+            self.perm, self.sign, self.regular =\
+                _bareiss_eliminate(self.table, size)
+            return
+        if np is not None:
+            table = np.array(mat, dtype=float)
+            for k in range(size):
+                pivot_row = k + int(np.argmax(np.abs(table[k:, k])))
+                if table[pivot_row, k] == 0:
+                    continue
+                self._swap(table, k, pivot_row)
+                table[k + 1:, k] /= table[k, k]
+                table[k + 1:, k + 1:] -= np.outer(table[k + 1:, k],
+                                                  table[k, k + 1:])
+            self.table = table
+            self.regular = bool(np.all(np.diag(table) != 0))
+            return
 
-        if arg is not None:
-            list.__init__(self, arg)
-            arg = recurse_fractionalize(self)
-            list.__init__(self, arg)
+        table = [[float(x) for x in next_row] for next_row in mat]
+        for k in range(size):
+            pivot_row = max(range(k, size), key=lambda i: abs(table[i][k]))
+            if table[pivot_row][k] == 0:
+                continue
+            self._swap(table, k, pivot_row)
+            pivot = table[k][k]
+            pivot_tail = table[k][k + 1:]
+            for row_i in islice(table, k + 1, None):
+                if row_i[k] == 0:
+                    continue
+                factor = row_i[k] / pivot
+                row_i[k] = factor
+                row_i[k + 1:] = [x - factor * y for x, y
+                                 in zip(islice(row_i, k + 1, None),
+                                        pivot_tail)]
+        self.table = table
+        self.regular = all(table[i][i] != 0 for i in range(size))
+
+    def _swap(self, table, first: int, second: int) -> None:
+        if first == second:
+            return
+        if np is not None and isinstance(table, np.ndarray):
+            table[[first, second]] = table[[second, first]]
         else:
-            list.__init__(self, [])
+            table[first], table[second] = table[second], table[first]
+        self.perm[first], self.perm[second] =\
+            self.perm[second], self.perm[first]
+        self.sign = -self.sign
 
-    def __str__(self):
+    @property
+    def det(self):
         """
-        __str__ method for `str()`.
+        Fraction or float: Determinant of the matrix.
         """
-        def recursive_str(mat, depth=1):
-            to_return = ""
-            for next_row in mat:
-                if isinstance(next_row, list):
-                    to_return += "["
-                    if isinstance(next_row[0], list):
-                        to_return += recursive_str(next_row, depth + 1)
-                        to_return = to_return
-                    else:
-                        for next_elem in next_row:
-                            to_return += str(next_elem)
-                            to_return += " "
-                        to_return = to_return[:-1]
-                    to_return += "]\n"
-                    to_return += " " * depth
-                else:
-                    to_return += str(next_row)
-                    to_return += " "
-            return to_return[:-(1 + depth)]
-
-        def format_output(string):
-            positions = []
-            string_list = string.split("\n")
-            if len(string_list) == 1:
-                return string
-            i = 0
-            for next_string in string_list:
-                positions.append([])
-                next_string = next_string.replace("[", " ").replace("]", "")
-                char_list = next_string.split(" ")
-                char_list = [x for x in char_list if x != '']
-                positions[i] = [len(x) for x in char_list]
-                i += 1
-            maximums = []
-            for i in range(len(positions[0])):
-                maximums.append(max([x[i] for x in positions]))
-            positions = [[maximums[j] - positions[i][j]
-                          for j in range(len(maximums))]
-                         for i in range(len(positions))]
-            i = 0
-            j = 0
-            to_return = ""
-            manufacturing = False
-            for next_chr in string:
-                if next_chr in "[ ":
-                    manufacturing = True
-                if next_chr in "0123456789-/" and manufacturing:
-                    to_return += " " * positions[i][j]
-                    manufacturing = False
-                    j += 1
-                if next_chr == "\n":
-                    j = 0
-                    i += 1
-                to_return += next_chr
-            return to_return
+        if self.dtype != 'float':
+            if not self.regular:
+                return Fraction(0)
+            scale = 1
+            for next_scale in self.scales:
+                scale *= next_scale
+            return Fraction(self.sign * self.table[-1][-1], scale)
+        to_return = float(self.sign)
+        for i in range(len(self.perm)):
+            to_return *= self.table[i][i]
+        return float(to_return)
 
-        return format_output("[" + recursive_str(self) + "]")
+    def solve(self, vals) -> 'Matrix':
+        """
+        Solve `A @ x == vals`.
 
-    def __matmul__(self, other):
+        Parameters
+        ----------
+        vals
+            Right-sided values.
+
+        Raises
+        ------
+        ZeroDivisionError
+            If the matrix is singular.
+
+        Returns
+        -------
+        Matrix
+            1D matrix of roots.
         """
-        __matmul__ method for `@`.
-        Based on PEP 465.
+        return Matrix._from_trusted(
+            self.solve_many([[x] for x in vals]).T[0], self.dtype)
+
+    def solve_many(self, second) -> 'Matrix':
+        """
+        Solve `A @ X == second` for every column of `second`.
+
+        Parameters
+        ----------
+        second
+            2D right-side matrix.
 
         Raises
         ------
         ValueError
-            If matrix multiply is unsupported.
+            If length of `second` is different from the matrix.
+        ZeroDivisionError
+            If the matrix is singular.
+
+        Returns
+        -------
+        Matrix
+            2D matrix of roots, in same shape as `second`.
         """
-        def fit(first, second):
-            a, b = Matrix(first[:]), Matrix(second[:])
-            swiched = False
-            if len(b.shape) > len(a.shape):
-                a, b = b, a
-                swiched = True
-            elif len(b.shape) == len(a.shape):
-                return a, b
-            b_shape = b.shape
-            b = list(b)
-            for _ in a.shape[:len(b_shape) - 1][::-1]:
-                b = [[x for x in b] for _ in range(len(b))]
-            if not swiched:
-                return Matrix(a), Matrix(b)
-            return Matrix(b), Matrix(a)
-        if not isinstance(other, list):
+        size = len(self.perm)
+        if len(second) != size:
+            raise ValueError(
+                'Length of argument is {}, while length of given matrix is {}'
+                .format(len(second), size))
+        table = self.table
+        if not self.regular:
+            if self.dtype == 'float':
+                raise ZeroDivisionError("Error : Attempt to divide with 0.")
+            raise ZeroDivisionError("Error : Attempt to divide 0 with 0.")
+
+        if self.dtype != 'float':
+            to_return = self._solve_exact(second)
+        elif isinstance(table, list):
+            to_return = [[float(x) for x in second[p]] for p in self.perm]
+            for i, row_i in enumerate(table):
+                next_result = to_return[i]
+                for k in range(i):
+                    if row_i[k] != 0:
+                        next_result[:] = [x - row_i[k] * y for x, y
+                                          in zip(next_result, to_return[k])]
+            for i in range(size - 1, -1, -1):
+                row_i = table[i]
+                next_result = to_return[i]
+                for k in range(i + 1, size):
+                    if row_i[k] != 0:
+                        next_result[:] = [x - row_i[k] * y for x, y
+                                          in zip(next_result, to_return[k])]
+                next_result[:] = [x / row_i[i] for x in next_result]
+        else:
+            to_return = np.array(second, dtype=float)[self.perm]
+            for i in range(size):
+                to_return[i] -= table[i, :i] @ to_return[:i]
+            for i in range(size - 1, -1, -1):
+                to_return[i] -= table[i, i + 1:] @ to_return[i + 1:]
+                to_return[i] /= table[i, i]
+            to_return = to_return.tolist()
+        return Matrix._from_trusted(to_return, self.dtype,
+                                    (size, len(second[0])))
+
+    def _solve_exact(self, second) -> List[List[Fraction]]:
+        size = len(self.perm)
+        table = self.table
+        second = [[Fraction(x) for x in next_row] for next_row in second]
+        common = lcm(*[x.denominator for next_row in second
+                       for x in next_row])
+        to_return = [[x.numerator * (common // x.denominator) *
+                      self.scales[p] for x in second[p]] for p in self.perm]
+        prev_pivot = 1
+        for k in range(size):
+            pivot = table[k][k]
+            pivot_row = to_return[k]
+            for i in range(k + 1, size):
+                factor = table[i][k]
+                to_return[i] = [(x * pivot - factor * y) // prev_pivot
+                                for x, y in zip(to_return[i], pivot_row)]
+            prev_pivot = pivot
+        to_return = _bareiss_back_substitute(table, to_return)
+        denominator = table[-1][-1] * common
+        return [[Fraction(x, denominator) for x in next_row]
+                for next_row in to_return]
+
+    def inverse(self) -> 'Matrix':
+        """
+        Get inverse of the matrix.
+
+        Raises
+        ------
+        ZeroDivisionError
+            If the matrix is singular.
+
+        Returns
+        -------
+        Matrix
+            Inverse matrix.
+        """
+        return self.solve_many(Matrix.unit_mat(len(self.perm), self.dtype))
+
+
+_MATRIX_MAGIC = b'MTXB'
+_MATRIX_VERSION = 1
+_MATRIX_HEADER = struct.Struct('<4sBccB')
+_DTYPE_CODES = {'int': b'i', 'fraction': b'r', 'float': b'd'}
+_DTYPE_NAMES = {code: dtype for dtype, code in _DTYPE_CODES.items()}
+_ENCODING_CODES = {'fixed': b'f', 'variable': b'v'}
+
+
+def _fixed_bytes(dtype: str, values: list) -> bytes:
+    data = array('d' if dtype == 'float' else 'q', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_fixed(view: memoryview, dtype: str, offset: int,
+                count: int) -> Tuple[list, int]:
+    """
+    Read `count` little-endian int64 or float64 from `offset`.
+    Returns values and offset after them.
+    """
+    end = offset + 8 * count
+    if len(view) < end:
+        raise ValueError('Matrix data is truncated')
+    typecode = 'd' if dtype == 'float' else 'q'
+    if sys.byteorder == 'little':
+        with view[offset:end] as chunk, chunk.cast(typecode) as values:
+            return values.tolist(), end
+    values = array(typecode, view[offset:end])
+    values.byteswap()
+    return values.tolist(), end
+
+
+def _variable_bytes(values: List[int]) -> bytearray:
+    """
+    Write each int as its length in bytes as unsigned LEB128,
+    and then little-endian two's complement bytes.
+    """
+    to_return = bytearray()
+    for x in values:
+        size = length = (x.bit_length() + 8) // 8
+        while length > 0x7f:
+            to_return.append(length & 0x7f | 0x80)
+            length >>= 7
+        to_return.append(length)
+        to_return += x.to_bytes(size, 'little', signed=True)
+    return to_return
+
+
+def _read_variable(view: memoryview, dtype: str, offset: int,
+                   count: int) -> Tuple[List[int], int]:
+    """
+    Read `count` ints written by `_variable_bytes` from `offset`.
+    Returns values and offset after them.
+    """
+    to_return = []
+    try:
+        for _ in range(count):
+            size = shift = 0
+            while True:
+                next_byte = view[offset]
+                offset += 1
+                size |= (next_byte & 0x7f) << shift
+                shift += 7
+                if next_byte < 0x80:
+                    break
+            if len(view) < offset + size:
+                raise IndexError
+            to_return.append(int.from_bytes(view[offset:offset + size],
+                                            'little', signed=True))
+            offset += size
+    except IndexError:
+        raise ValueError('Matrix data is truncated')
+    return to_return, offset
+
+
+class PackedMatrix:
+    """
+    Compact matrix stored in one flat buffer with shape and strides.
+    Elements are kept as integer numerators with one common denominator,
+    and are made into Fraction only when read.
+
+    Parameters
+    ----------
+    data
+        Flat buffer of numerators. array of int64 if values fit.
+    shape
+        Shape of the matrix.
+    denominator
+        Common denominator of every element.
+    strides
+        Step in `data` for each axis. If not given, row-major order is used.
+    offset
+        Position in `data` of first element.
+
+    Examples
+    --------
+    >>> a = PackedMatrix.from_matrix([[1,2,3],[2,5,3],[1,0,8]])
+    >>> a.shape
+    (3, 3)
+    >>> print(a.det)
+    -1
+    >>> print(a.T @ (a * Fraction(1, 2)))
+    [[   3    6 17/2]
+     [   6 29/2 21/2]
+     [17/2 21/2   41]]
+    """
+    __slots__ = ('data', 'shape', 'denominator', 'strides', 'offset')
+
+    def __init__(self, data, shape: Tuple[int, ...], denominator: int = 1,
+                 strides: Optional[Tuple[int, ...]] = None, offset: int = 0):
+        if strides is None:
+            strides = []
+            step = 1
+            for next_len in reversed(shape):
+                strides.insert(0, step)
+                step *= next_len
+            strides = tuple(strides)
+        self.data = data
+        self.shape = tuple(shape)
+        self.denominator = denominator
+        self.strides = strides
+        self.offset = offset
+
+    @classmethod
+    def from_matrix(cls, mat: list) -> 'PackedMatrix':
+        """
+        Pack given matrix.
+
+        Parameters
+        ----------
+        mat
+            Matrix or nested list to pack.
+
+        Raises
+        ------
+        TypeError
+            If matrix has float dtype.
+
+        Returns
+        -------
+        PackedMatrix
+            Packed matrix with same elements.
+        """
+        if isinstance(mat, PackedMatrix):
+            return mat
+        mat = Matrix(mat, getattr(mat, 'dtype', 'fraction'))
+        if mat.dtype == 'float':
+            raise TypeError('PackedMatrix keeps exact numerators,'
+                            ' but float matrix is given')
+        flat = mat
+        for _ in mat.shape[1:]:
+            flat = [x for next_row in flat for x in next_row]
+        return cls._from_fractions(flat, mat.shape)
+
+    @classmethod
+    def from_text(cls, stream, delimiter: Optional[str] = None,
+                  chunk_size: int = 1 << 20) -> 'PackedMatrix':
+        """
+        Read 2D matrix from text stream, like `Matrix.from_text`.
+        Each row is put into packed buffer when it is read,
+        so neither the text nor nested list of the rows is kept.
+        Buffer is rescaled when a row needs larger common denominator.
+
+        Parameters
+        ----------
+        stream
+            Text stream, like opened file or sys.stdin.
+        delimiter
+            String between elements. If None, any whitespace is used.
+        chunk_size
+            Number of characters read at a time.
+
+        Raises
+        ------
+        ValueError
+            If element is not a number, or rows have different lengths.
+
+        Returns
+        -------
+        PackedMatrix
+            Read matrix.
+
+        Examples
+        --------
+        >>> from io import StringIO
+        >>> a = PackedMatrix.from_text(StringIO("1  2 3/4\\n-5 0.5 6\\n"))
+        >>> a.shape, a.denominator
+        ((2, 3), 4)
+        >>> print(a)
+        [[ 1   2 3/4]
+         [-5 1/2   6]]
+        """
+        data = array('q')
+        denominator = 1
+        rows = cols = 0
+        for tokens in _text_rows(stream, delimiter, chunk_size):
+            try:
+                numerators = list(map(int, tokens))
+                row_denominator = 1
+            except ValueError:
+                values = _parse_row(tokens, 'fraction')
+                row_denominator = lcm(*[x.denominator for x in values])
+                numerators = [x.numerator * (row_denominator // x.denominator)
+                              for x in values]
+            if denominator % row_denominator:
+                scale = row_denominator // gcd(denominator, row_denominator)
+                data = _pack_ints([x * scale for x in data])
+                denominator *= scale
+            if denominator != row_denominator:
+                scale = denominator // row_denominator
+                numerators = [x * scale for x in numerators]
+            if isinstance(data, array):
+                try:
+                    numerators = array('q', numerators)
+                except OverflowError:
+                    data = list(data)
+            data.extend(numerators)
+            rows += 1
+            cols = len(numerators)
+        return cls(data, (rows, cols), denominator)
+
+    @classmethod
+    def from_csv(cls, path: str, delimiter: str = ',') -> 'PackedMatrix':
+        """
+        Read 2D matrix from CSV file of numbers. See `from_text`.
+
+        Parameters
+        ----------
+        path
+            Path of file.
+        delimiter
+            String between elements.
+
+        Raises
+        ------
+        ValueError
+            If element is not a number, or rows have different lengths.
+
+        Returns
+        -------
+        PackedMatrix
+            Read matrix.
+        """
+        with open(path, newline='') as f:
+            return cls.from_text(f, delimiter)
+
+    @classmethod
+    def _from_fractions(cls, flat: list, shape: Tuple[int, ...]
+                        ) -> 'PackedMatrix':
+        denominator = lcm(*[x.denominator for x in flat]) if flat else 1
+        return cls(_pack_ints([x.numerator * (denominator // x.denominator)
+                               for x in flat]), shape, denominator)
+
+    @classmethod
+    def _from_numerators(cls, numerators: list, shape: Tuple[int, ...],
+                         denominator: int) -> 'PackedMatrix':
+        divisor = gcd(denominator, *numerators)
+        if denominator < 0:
+            divisor = -divisor
+        if divisor != 1:
+            numerators = [x // divisor for x in numerators]
+            denominator //= divisor
+        return cls(_pack_ints(numerators), shape, denominator)
+
+    def to_matrix(self) -> 'Matrix':
+        """
+        Get matrix with nested list of Fraction.
+
+        Returns
+        -------
+        Matrix
+            Unpacked matrix.
+        """
+        return Matrix._from_trusted(self.tolist())
+
+    def tolist(self) -> list:
+        """
+        Get elements as nested list of Fraction.
+        """
+        if self.ndim == 1:
+            return [Fraction(x, self.denominator) for x in self.numerators()]
+        return [next_row.tolist() for next_row in self]
+
+    def numerators(self) -> List[int]:
+        """
+        Get numerators in row-major order.
+        """
+        if self.ndim == 1:
+            end = self.offset + self.shape[0] * self.strides[0]
+            return list(self.data[self.offset:end:self.strides[0]])
+        return [x for next_row in self for x in next_row.numerators()]
+
+    def _int_rows(self) -> List[List[int]]:
+        return [next_row.numerators() for next_row in self]
+
+    @property
+    def ndim(self) -> int:
+        """
+        int: Number of dimensions.
+        """
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            position = self.offset
+            for i, next_len, stride in zip(index, self.shape, self.strides):
+                if not -next_len <= i < next_len:
+                    raise IndexError('Index {} is out of range for shape {}'
+                                     .format(index, self.shape))
+                position += (i % next_len) * stride
+            if len(index) == self.ndim:
+                return Fraction(self.data[position], self.denominator)
+            return PackedMatrix(self.data, self.shape[len(index):],
+                                self.denominator, self.strides[len(index):],
+                                position)
+        return self[(index,)]
+
+    def __eq__(self, other):
+        if not isinstance(other, (PackedMatrix, list)):
+            return NotImplemented
+        other = PackedMatrix.from_matrix(other)
+        return self.shape == other.shape and self.tolist() == other.tolist()
+
+    def __str__(self):
+        return str(self.to_matrix())
+
+    def __repr__(self):
+        return 'PackedMatrix({})'.format(self.tolist())
+
+    def __matmul__(self, other):
+        """
+        __matmul__ method for `@`.
+        Calculated with integer numerators only.
+        """
+        if not isinstance(other, (PackedMatrix, list)):
             raise ValueError("Attempt to multiply matrix with {}"
                              .format(type(other).__name__))
-        a = Matrix(self[:])
-        b = Matrix(other[:])
-        a_1d = False
-        b_1d = False
-        if len(a.shape) == 1:
-            a_1d = True
-            a = Matrix([a])
-        if len(b.shape) == 1:
-            b_1d = True
-            b = Matrix([b]).T
-        if len(a.shape) > 2 or len(b.shape) > 2:
-            a, b = fit(a, b)
-            to_return = []
-            for i, self_next_row in enumerate(self):
-                to_return.append(Matrix(self_next_row) @ Matrix(other[i]))
-            return Matrix(to_return)
-
-        if len(a[0]) != len(b):
+        other = PackedMatrix.from_matrix(other)
+        if self.ndim > 2 or other.ndim > 2:
+            return PackedMatrix.from_matrix(self.to_matrix() @
+                                            other.to_matrix())
+        a_rows = [self.numerators()] if self.ndim == 1 else self._int_rows()
+        if other.ndim == 1:
+            b_cols = [other.numerators()]
+        else:
+            b_cols = other.T._int_rows()
+        if len(a_rows[0]) != len(b_cols[0]):
             raise ValueError(
                 'Attempt to multiply {}*{} matrix with {}*{} matrix'
-                .format(len(a), len(a[0]), len(b), len(b[0])))
-        b = b.T
-        to_return = Matrix([[sum([i[n] * j[n] for n in range(len(i))])
-                             for j in b] for i in a])
-        if a_1d and b_1d:
-            return to_return[0][0]
-        if a_1d:
-            return Matrix(to_return[0])
-        if b_1d:
-            return Matrix(to_return.T[0])
+                .format(len(a_rows), len(a_rows[0]),
+                        len(b_cols[0]), len(b_cols)))
+        numerators = [sum(map(mul, next_row, next_col))
+                      for next_row in a_rows for next_col in b_cols]
+        denominator = self.denominator * other.denominator
+        if self.ndim == 1 and other.ndim == 1:
+            return Fraction(numerators[0], denominator)
+        if self.ndim == 1:
+            shape = (len(b_cols),)
+        elif other.ndim == 1:
+            shape = (len(a_rows),)
+        else:
+            shape = (len(a_rows), len(b_cols))
+        return PackedMatrix._from_numerators(numerators, shape, denominator)
+
+    def __mul__(self, other):
+        """
+        __mul__ method for `*`.
+        If multiply matrix with matrix, it is element-wize.
+        """
+        if isinstance(other, (PackedMatrix, list)):
+            other = PackedMatrix.from_matrix(other)
+            if self.shape != other.shape:
+                raise ValueError(
+                    'Cannot multiply elementwize with different size :'
+                    ' {} and {}'.format(self.shape, other.shape))
+            return PackedMatrix._from_numerators(
+                list(map(mul, self.numerators(), other.numerators())),
+                self.shape, self.denominator * other.denominator)
+        other = Fraction(other)
+        return PackedMatrix._from_numerators(
+            [x * other.numerator for x in self.numerators()],
+            self.shape, self.denominator * other.denominator)
+
+    def __rmul__(self, other):
+        return self * other
+
+    def gauss_elim(self, second=None, step_by_step: bool = False
+                   ) -> 'PackedMatrix':
+        """
+        Calculate with gauss elimination. See `Matrix.gauss_elim`.
+        """
+        if second is not None:
+            second = PackedMatrix.from_matrix(second).to_matrix()
+        return PackedMatrix.from_matrix(
+            self.to_matrix().gauss_elim(second, step_by_step))
+
+    @property
+    def det(self) -> Fraction:
+        """
+        Fraction: Determinant of the matrix.
+        """
+        if self.ndim != 2 or self.shape[0] != self.shape[1]:
+            raise ValueError('Matrix must be square to get determinant,'
+                             ' but given matrix is {}'
+                             .format('*'.join(str(x) for x in self.shape)))
+        return Fraction(_bareiss_det(self._int_rows()),
+                        self.denominator ** self.shape[0])
+
+    @property
+    def T(self) -> 'PackedMatrix':
+        """
+        PackedMatrix: Transposed matrix. Shares buffer with this one.
+        """
+        if self.ndim == 1:
+            return PackedMatrix(self.data, self.shape + (1,),
+                                self.denominator, self.strides * 2,
+                                self.offset)
+        return PackedMatrix(self.data, self.shape[::-1], self.denominator,
+                            self.strides[::-1], self.offset)
+
+
+class LazyMatrix:
+    """
+    Expression of 2D matrixes, calculated only when `evaluate` is called.
+    `@`, `*` and `T` build expression graph instead of calculating.
+
+    When evaluated, transposes are moved to the matrixes and
+    read in transposed order by matrix multiply, scalars are multiplied
+    together and folded into the last matrix multiply, and chain of
+    matrix multiplies is calculated in cheapest order.
+    So only the final result and products inside the chain are made.
+
+    Parameters
+    ----------
+    mat
+        2D matrix to start expression with.
+
+    Raises
+    ------
+    ValueError
+        If matrix is not 2D.
+
+    Examples
+    --------
+    >>> a = Matrix([[1,2],[3,4]])
+    >>> b = Matrix([[0,1],[1,0]])
+    >>> expr = (a.lazy() @ b).T * 3 @ a
+    >>> expr
+    LazyMatrix(((2*2 @ 2*2).T * 3) @ 2*2)
+    >>> print(expr.evaluate())
+    [[42 60]
+     [30 42]]
+    >>> expr.evaluate() == (a @ b).T * 3 @ a
+    True
+    """
+    __slots__ = ('op', 'args', 'shape')
+
+    def __init__(self, mat: list):
+        mat = mat if isinstance(mat, Matrix) else Matrix(mat)
+        if mat.ndim != 2:
+            raise ValueError('Lazy matrix must be 2D, but {}D matrix given'
+                             .format(mat.ndim))
+        self.op = 'matrix'
+        self.args = (mat,)
+        self.shape = mat.shape
+
+    @classmethod
+    def _node(cls, op: str, args: tuple, shape: Tuple[int, int]
+              ) -> 'LazyMatrix':
+        to_return = object.__new__(cls)
+        to_return.op = op
+        to_return.args = args
+        to_return.shape = shape
         return to_return
 
-    def __imatmul__(self, other):
+    @staticmethod
+    def _wrap(other) -> 'LazyMatrix':
+        if isinstance(other, LazyMatrix):
+            return other
+        if not isinstance(other, list):
+            raise ValueError("Attempt to multiply matrix with {}"
+                             .format(type(other).__name__))
+        return LazyMatrix(other)
+
+    def __matmul__(self, other):
         """
-        __imatmul__ method for `@=`.
+        __matmul__ method for `@`.
         """
-        self = self @ other
-        return self
+        other = self._wrap(other)
+        if self.shape[1] != other.shape[0]:
+            raise ValueError(
+                'Attempt to multiply {}*{} matrix with {}*{} matrix'
+                .format(*self.shape, *other.shape))
+        return self._node('matmul', (self, other),
+                          (self.shape[0], other.shape[1]))
+
+    def __rmatmul__(self, other):
+        return self._wrap(other) @ self
 
     def __mul__(self, other):
         """
         __mul__ method for `*`.
-        If multiply matrix with matrix, it is element-wize,
-        not matrix multiply.
+        If multiply with matrix, it is element-wize.
         """
-        if not isinstance(other, Matrix):
-            return Matrix([[x * other for x in k] for k in self])
+        if not isinstance(other, (LazyMatrix, list)):
+            return self._node('scale', (self, other), self.shape)
+        other = self._wrap(other)
         if self.shape != other.shape:
             raise ValueError(
                 'Cannot multiply elementwize with different size : {} and {}'
                 .format(self.shape, other.shape))
-        if len(self.shape) == 1:
-            to_return = []
-            for i, self_next_row in enumerate(self):
-                to_return.append(self_next_row * other[i])
-            return Matrix(to_return)
-        to_return = []
-        for i, self_next_row in enumerate(self):
-            to_return.append(Matrix(self_next_row) * Matrix(other[i]))
-        return Matrix(to_return)
+        return self._node('mul', (self, other), self.shape)
 
     def __rmul__(self, other):
+        if isinstance(other, list):
+            return self._wrap(other) * self
+        return self * other
+
+    @property
+    def T(self) -> 'LazyMatrix':
         """
-        __rmul__ method for case like int * matrix.
+        LazyMatrix: Transposed expression.
         """
-        return Matrix([[x * other for x in k] for k in self])
+        return self._node('transpose', (self,),
+                          (self.shape[1], self.shape[0]))
 
-    def __imul__(self, other):
+    def _flatten(self, transposed: bool) -> Tuple[object, list]:
         """
-        __imul__ method for `*=`.
+        Get expression as scalar times chain of matrix multiplies.
+        Each matrix of chain is kept with whether it is transposed.
         """
-        self = self * other
-        return self
+        if self.op == 'matrix':
+            return 1, [(self.args[0], transposed)]
+        if self.op == 'transpose':
+            return self.args[0]._flatten(not transposed)
+        if self.op == 'scale':
+            scalar, factors = self.args[0]._flatten(transposed)
+            return scalar * self.args[1], factors
+        if self.op == 'matmul':
+            left_scalar, left = self.args[0]._flatten(transposed)
+            right_scalar, right = self.args[1]._flatten(transposed)
+            factors = right + left if transposed else left + right
+            return left_scalar * right_scalar, factors
+        value = self.args[0].evaluate() * self.args[1].evaluate()
+        return 1, [(value, transposed)]
 
-    def __invert__(self):
+    def evaluate(self) -> Matrix:
         """
-        __invert__ method for `~`.
-        Return inverse matrix.
+        Calculate the expression.
+
+        Returns
+        -------
+        Matrix
+            Result of the expression.
+        """
+        scalar, factors = self._flatten(False)
+        dtype = _common_dtype(scalar, *[mat for mat, _ in factors])
+        factors = [(mat if mat.dtype == dtype else Matrix(mat, dtype),
+                    transposed) for mat, transposed in factors]
+        dims = [mat.shape[1] if transposed else mat.shape[0]
+                for mat, transposed in factors] + [self.shape[1]]
+        count = len(factors)
+        costs = [[0] * count for _ in range(count)]
+        splits = [[0] * count for _ in range(count)]
+        for length in range(1, count):
+            for i in range(count - length):
+                j = i + length
+                costs[i][j], splits[i][j] = min(
+                    (costs[i][k] + costs[k + 1][j] +
+                     dims[i] * dims[k + 1] * dims[j + 1], k)
+                    for k in range(i, j))
+
+        use_np = dtype == 'float' and np is not None
+
+        def product(i, j, to_mul=1):
+            if i == j:
+                mat, transposed = factors[i]
+                if use_np:
+                    mat = np.array(mat, dtype=float)
+                    return mat.T if transposed else mat, False
+                return mat, transposed
+            k = splits[i][j]
+            left, left_transposed = product(i, k)
+            right, right_transposed = product(k + 1, j)
+            if use_np:
+                return left @ right, False
+            return _matmul_rows(left, right, dtype, Matrix.block_size,
+                                Matrix.strassen_threshold,
+                                (left_transposed, right_transposed),
+                                to_mul), False
+
+        folded = count > 1 and not use_np
+        to_return, transposed = product(0, count - 1,
+                                        scalar if folded else 1)
+        if use_np:
+            to_return = (to_return * scalar).tolist()
+        elif transposed:
+            to_return = [list(x) for x in zip(*to_return)]
+        elif count == 1:
+            to_return = _copy_nested(to_return)
+        if not folded and scalar != 1:
+            to_return = [[x * scalar for x in next_row]
+                         for next_row in to_return]
+        return Matrix._from_trusted(to_return, dtype, self.shape)
+
+    def __str__(self):
+        return str(self.evaluate())
+
+    def __repr__(self):
+        def describe(node):
+            if node.op == 'matrix':
+                return '{}*{}'.format(*node.shape)
+            if node.op == 'transpose':
+                return describe(node.args[0]) + '.T'
+            if node.op == 'scale':
+                return '({} * {})'.format(describe(node.args[0]),
+                                          node.args[1])
+            return '({} {} {})'.format(describe(node.args[0]),
+                                       '@' if node.op == 'matmul' else '*',
+                                       describe(node.args[1]))
+        to_return = describe(self)
+        if self.op not in ('matrix', 'transpose'):
+            to_return = to_return[1:-1]
+        return 'LazyMatrix({})'.format(to_return)
+
+
+class SparseMatrix:
+    """
+    2D matrix keeping only nonzero elements,
+    as dict of column index to element for each row.
+    Multiply, transpose and elimination work on nonzero elements only.
+
+    Parameters
+    ----------
+    rows
+        Dict of column index to nonzero element, for each row.
+    shape
+        Number of rows and columns.
+    dtype
+        Type of elements. See `Matrix`.
+
+    Examples
+    --------
+    >>> a = SparseMatrix.from_matrix([[4,0,0,1],[0,2,0,0],[0,0,0,3],[1,0,5,0]])
+    >>> a.nnz
+    6
+    >>> print(a @ a.T)
+    [[17 0 3  4]
+     [ 0 4 0  0]
+     [ 3 0 9  0]
+     [ 4 0 0 26]]
+    >>> print(a.det)
+    -120
+    >>> print(a.gauss_elim([5, 2, 3, 7]))
+    [[  1]
+     [  1]
+     [6/5]
+     [  1]]
+    """
+    __slots__ = ('rows', 'shape', 'dtype')
+
+    def __init__(self, rows: List[Dict[int, object]], shape: Tuple[int, int],
+                 dtype: str = 'fraction'):
+        if dtype not in _CONVERTERS:
+            raise ValueError('Unknown dtype : {}'.format(dtype))
+        self.rows = rows
+        self.shape = tuple(shape)
+        self.dtype = dtype
+
+    @classmethod
+    def from_matrix(cls, mat: list, dtype: Optional[str] = None
+                    ) -> 'SparseMatrix':
+        """
+        Make sparse matrix from dense one.
+
+        Parameters
+        ----------
+        mat
+            2D Matrix or nested list.
+        dtype
+            Type of elements. If not given, dtype of `mat` is used.
 
         Raises
         ------
-        ZeroDivisionError
-            If there is no inverse matrix.
+        ValueError
+            If matrix is not 2D.
+
+        Returns
+        -------
+        SparseMatrix
+            Sparse matrix with same elements.
         """
-        try:
-            return self.inverse_using_det()
-        except ZeroDivisionError as e:
-            err_str = e.args[0]
-            a, _ = err_str.split(", ")
-            a = a[9:]
-            raise ZeroDivisionError("Error : Attempt to divide " + a +
-                                    " with 0.")
+        if isinstance(mat, SparseMatrix):
+            if dtype is None or dtype == mat.dtype:
+                return mat
+            return mat.astype(dtype)
+        if dtype is None:
+            dtype = getattr(mat, 'dtype', 'fraction')
+        if not (isinstance(mat, Matrix) and mat.dtype == dtype):
+            mat = Matrix(mat, dtype)
+        if mat.ndim != 2:
+            raise ValueError('Sparse matrix must be 2D, but {}D matrix given'
+                             .format(mat.ndim))
+        return cls([{j: x for j, x in enumerate(next_row) if x != 0}
+                    for next_row in mat], mat.shape, dtype)
 
-    def gauss_elim(self, second: Optional['Matrix'] = None,
-                   step_by_step: bool = False) -> 'Matrix':
+    @classmethod
+    def from_dict(cls, entries: Dict[Tuple[int, int], object],
+                  shape: Tuple[int, int], dtype: str = 'fraction'
+                  ) -> 'SparseMatrix':
         """
-        Calculate with gauss elimination.
-        Returns right-side matrix after calculation.
+        Make sparse matrix from dict of keys.
 
         Parameters
         ----------
-        second
-            Right-side matrix. can be 1D or 2D.
-            If not given, this method calculates inverse matrix.
-        step_by_step
-            If true, print step by step solution.
+        entries
+            Dict of (row, column) to element. Missing ones are zero.
+        shape
+            Number of rows and columns.
+        dtype
+            Type of elements. See `Matrix`.
 
         Raises
         ------
-        ValueError
-            If self is not square matrix, or length is different.
-        ZeroDivisionError
-            If cannot calculate due to divide with zero.
-            It happens when determinent of self is zero.
+        IndexError
+            If index is out of shape.
 
         Returns
         -------
-        Matrix
-            Result of gauss elimination calculation.
+        SparseMatrix
+            Made sparse matrix.
+        """
+        convert = _CONVERTERS[dtype]
+        rows = [{} for _ in range(shape[0])]
+        for (i, j), x in entries.items():
+            if not (0 <= i < shape[0] and 0 <= j < shape[1]):
+                raise IndexError('Index {} is out of range for shape {}'
+                                 .format((i, j), tuple(shape)))
+            x = convert(x)
+            if x != 0:
+                rows[i][j] = x
+        return cls(rows, shape, dtype)
 
-        Examples
-        --------
-        Example of using gauss_elim with no option:
+    def astype(self, dtype: str) -> 'SparseMatrix':
+        """
+        Get copy with elements converted to `dtype`.
+        """
+        convert = _CONVERTERS[dtype]
+        return SparseMatrix([{j: convert(x) for j, x in next_row.items()}
+                             for next_row in self.rows], self.shape, dtype)
 
-        >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
-        >>> print(a.gauss_elim())
-        [[-40 16  9]
-         [ 13 -5 -3]
-         [  5 -2 -1]]
+    def to_matrix(self) -> Matrix:
+        """
+        Get dense matrix.
 
-        Example of using gauss_elim with option:
+        Returns
+        -------
+        Matrix
+            Matrix with same elements.
+        """
+        return Matrix._from_trusted(self.tolist(), self.dtype, self.shape)
 
-        >>> b = Matrix([[1,0,0],[0,1,0],[0,0,1]])
-        >>> print(a.gauss_elim(b))
-        [[-40 16  9]
-         [ 13 -5 -3]
-         [  5 -2 -1]]
+    def tolist(self) -> List[list]:
+        """
+        Get elements as dense nested list.
+        """
+        return [self._dense_row(next_row) for next_row in self.rows]
 
-        Example of using step by step solution:
+    def _dense_row(self, row: Dict[int, object]) -> list:
+        to_return = [_CONVERTERS[self.dtype](0)] * self.shape[1]
+        for j, x in row.items():
+            to_return[j] = x
+        return to_return
 
-        >>> a.gauss_elim(step_by_step=True) #doctest: +ELLIPSIS
-        1 2 3 | 1 0 0
-        2 5 3 | 0 1 0
-        1 0 8 | 0 0 1
-        Add row 1 * -2 to row 2
-        ...
+    @property
+    def nnz(self) -> int:
+        """
+        int: Number of nonzero elements.
+        """
+        return sum(len(next_row) for next_row in self.rows)
 
+    @property
+    def ndim(self) -> int:
+        """
+        int: Number of dimensions, which is always 2.
         """
+        return 2
 
-        def print_gauss():
-            string = str(first)
-            str_list = string.split("\n")
-            str_list = [x.strip().replace("[", "").replace("]", "")
-                        for x in str_list]
-            string2 = str(second)
-            str2_list = string2.split("\n")
-            str2_list = [x.strip().replace("[", "").replace("]", "")
-                         for x in str2_list]
-            for i in range(len(first)):
-                print(str_list[i], "|", str2_list[i])
+    def __len__(self):
+        return self.shape[0]
 
-        def change_row(src, dest):
-            if src != dest:
-                if step_by_step:
-                    print("Change row", src + 1, "with row", dest + 1)
-                first[src], first[dest], second[src], second[dest] =\
-                    first[dest], first[src], second[dest], second[src]
-                if step_by_step:
-                    print_gauss()
+    def __iter__(self):
+        for next_row in self.rows:
+            yield self._dense_row(next_row)
 
-        def div_row(row, num):
-            if step_by_step:
-                print("Divide row", row + 1, "by", num)
-            try:
-                first[row] = [x / num for x in first[row]]
-                second[row] = [x / num for x in second[row]]
-            except ZeroDivisionError as e:
-                err_str = e.args[0]
-                a, _ = err_str.split(", ")
-                a = a[9:]
-                raise ZeroDivisionError("Error : Attempt to divide " + a +
-                                        " with 0.")
-            if step_by_step:
-                print_gauss()
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            i, j = index
+            return self.rows[i].get(j % self.shape[1],
+                                    _CONVERTERS[self.dtype](0))
+        return self._dense_row(self.rows[index])
 
-        def add_row(src, dest, to_mul):
-            if step_by_step:
-                print("Add row", src + 1, "*", to_mul, "to row", dest + 1)
-            temp_first = first[:]
-            temp_second = second[:]
-            for i in range(len(first[src])):
-                first[dest][i] += temp_first[src][i] * to_mul
-            for i in range(len(second[src])):
-                second[dest][i] += temp_second[src][i] * to_mul
-            if step_by_step:
-                print_gauss()
-
-        first = Matrix(self[:])
-        if second is None:
-            second = Matrix.unit_mat(len(first))
-        second = Matrix(second[:])
-        if not isinstance(second[0], list):
-            second = second.T
-        if len(first) != len(first[0]):
-            raise ValueError(
-                'Matrix must be square to use Gauss elimination,'
-                ' but given matrix is {}*{}'
-                .format(len(first), len(first[0])))
-        if len(first) != len(second):
+    def __eq__(self, other):
+        if isinstance(other, SparseMatrix):
+            return self.shape == other.shape and self.rows == other.rows
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __str__(self):
+        return str(self.to_matrix())
+
+    def __repr__(self):
+        return 'SparseMatrix({}, shape={})'.format(
+            {(i, j): x for i, next_row in enumerate(self.rows)
+             for j, x in sorted(next_row.items())}, self.shape)
+
+    @property
+    def T(self) -> 'SparseMatrix':
+        """
+        SparseMatrix: Transposed matrix.
+        """
+        to_return = [{} for _ in range(self.shape[1])]
+        for i, next_row in enumerate(self.rows):
+            for j, x in next_row.items():
+                to_return[j][i] = x
+        return SparseMatrix(to_return, (self.shape[1], self.shape[0]),
+                            self.dtype)
+
+    @staticmethod
+    def _combine(pairs: Iterable[Tuple[object, Dict[int, object]]]
+                 ) -> Dict[int, object]:
+        """
+        Sum of sparse rows multiplied by scalars, without zeros.
+        """
+        to_return = {}
+        for scalar, next_row in pairs:
+            for j, x in next_row.items():
+                to_return[j] = to_return.get(j, 0) + scalar * x
+        return {j: x for j, x in to_return.items() if x != 0}
+
+    def __matmul__(self, other):
+        """
+        __matmul__ method for `@`.
+        Result is sparse if both are sparse, else dense Matrix.
+        """
+        if not isinstance(other, (SparseMatrix, list)):
+            raise ValueError("Attempt to multiply matrix with {}"
+                             .format(type(other).__name__))
+        dtype = _common_dtype(self, other)
+        if isinstance(other, SparseMatrix):
+            if self.shape[1] != other.shape[0]:
+                raise ValueError(
+                    'Attempt to multiply {}*{} matrix with {}*{} matrix'
+                    .format(*self.shape, *other.shape))
+            return SparseMatrix(
+                [self._combine((x, other.rows[k])
+                               for k, x in next_row.items())
+                 for next_row in self.rows],
+                (self.shape[0], other.shape[1]), dtype)
+        other = other if isinstance(other, Matrix) else Matrix(other)
+        if len(other) != self.shape[1] or other.ndim > 2:
             raise ValueError(
-                'Length of argument is {}, while length of given matrix is {}'
-                .format(len(second), len(first)))
+                'Attempt to multiply {}*{} matrix with {} matrix'
+                .format(*self.shape, '*'.join(map(str, other.shape))))
+        if other.ndim == 1:
+            return Matrix._from_trusted(
+                [sum((x * other[k] for k, x in next_row.items()),
+                     _CONVERTERS[dtype](0))
+                 for next_row in self.rows], dtype, (self.shape[0],))
+        width = len(other[0])
+        zero = _CONVERTERS[dtype](0)
+        to_return = []
+        for next_row in self.rows:
+            next_result = [zero] * width
+            for k, x in next_row.items():
+                next_result = [y + x * z for y, z in zip(next_result,
+                                                         other[k])]
+            to_return.append(next_result)
+        return Matrix._from_trusted(to_return, dtype,
+                                    (self.shape[0], width))
 
-        if step_by_step:
-            print_gauss()
-        for i, next_row in enumerate(first):
-            if next_row[i] != 1:
-                found = False
-                non_zero = i
-                for j in range(len(first) - i):
-                    if first[j + i][i] == 1:
-                        found = True
-                        change_row(i, j + i)
-                    elif next_row[i] == 0 and first[j + i][i] != 0\
-                         and non_zero == i:
-                        non_zero = j + i
-                if not found:
-                    change_row(i, non_zero)
-                    div_row(i, first[i][i])
+    def __rmatmul__(self, other):
+        if not isinstance(other, list):
+            raise ValueError("Attempt to multiply matrix with {}"
+                             .format(type(other).__name__))
+        other = other if isinstance(other, Matrix) else Matrix(other)
+        if other.ndim == 1:
+            return (self.T @ other)
+        return (self.T @ other.T).T
 
-            for j in range(len(first) - i - 1):
-                if first[j + i + 1][i] == 0:
-                    continue
-                add_row(i, j + i + 1, -first[j + i + 1][i])
+    def __mul__(self, other):
+        """
+        __mul__ method for `*`.
+        If multiply with matrix, it is element-wize.
+        """
+        dtype = _common_dtype(self, other)
+        if not isinstance(other, (SparseMatrix, list)):
+            return SparseMatrix([{j: x * other for j, x in next_row.items()}
+                                 if other != 0 else {}
+                                 for next_row in self.rows],
+                                self.shape, dtype)
+        other = SparseMatrix.from_matrix(other)
+        if self.shape != other.shape:
+            raise ValueError(
+                'Cannot multiply elementwize with different size : {} and {}'
+                .format(self.shape, other.shape))
+        to_return = []
+        for next_row, other_row in zip(self.rows, other.rows):
+            if len(other_row) < len(next_row):
+                next_row, other_row = other_row, next_row
+            to_return.append({j: x * other_row[j]
+                              for j, x in next_row.items()
+                              if j in other_row})
+        return SparseMatrix(to_return, self.shape, dtype)
 
-        for i in range(len(first) - 1, -1, -1):
-            if first[i][i] != 1:
-                found = False
-                for j in range(len(first) - i):
-                    if first[j + i][i] == 1:
-                        found = True
-                        change_row(i, j + i)
-                    elif first[i][i] == 0 and first[j + i][i] != 0\
-                         and non_zero == i:
-                        non_zero = j + i
-                if not found:
-                    change_row(i, non_zero)
-                    div_row(i, first[i][i])
+    def __rmul__(self, other):
+        return self * other
 
-            for j in range(i - 1, -1, -1):
-                if first[j][i] == 0:
-                    continue
-                add_row(i, j, -first[j][i])
+    def _eliminate(self, second: Optional[List[list]] = None,
+                   sink: Optional[TraceSink] = None
+                   ) -> Tuple[List[Tuple[int, int, object]],
+                              List[Dict[int, object]]]:
+        """
+        Sparse Gauss elimination with Markowitz pivoting.
+        Pivot minimizing (nonzeros in its row - 1) * (nonzeros in its
+        column - 1) is chosen on each step, to keep fill-in small.
+        Float pivot must also be at least 1/10 of largest one in column.
+
+        Right-side rows `second` are updated in place.
+        Returns pivots as (row, column, element) and eliminated rows.
+        Elimination stops at first step without pivot.
+        """
+        size = self.shape[0]
+        is_float = self.dtype == 'float'
+        convert = float if is_float else Fraction
+        rows = [{j: convert(x) for j, x in next_row.items()}
+                for next_row in self.rows]
+        col_rows = {}
+        for i, next_row in enumerate(rows):
+            for j in next_row:
+                col_rows.setdefault(j, set()).add(i)
+        active = set(range(size))
+        pivots = []
+        for _ in range(size):
+            if is_float:
+                col_max = {j: max(abs(rows[i][j]) for i in next_rows)
+                           for j, next_rows in col_rows.items()
+                           if next_rows}
+            best = None
+            for r in active:
+                row_cost = len(rows[r]) - 1
+                for c, x in rows[r].items():
+                    if is_float and abs(x) < col_max[c] / 10:
+                        continue
+                    key = (row_cost * (len(col_rows[c]) - 1), r, c)
+                    if best is None or key < best:
+                        best = key
+            if best is None:
+                break
+            _, r, c = best
+            pivot_row = rows[r]
+            pivot = pivot_row[c]
+            pivots.append((r, c, pivot))
+            active.remove(r)
+            for j in pivot_row:
+                col_rows[j].discard(r)
+            if sink:
+                sink.emit(Step('pivot', (r, c), pivot))
+            if pivot != 1:
+                pivot_row = rows[r] = {j: x / pivot
+                                       for j, x in pivot_row.items()}
+                if second is not None:
+                    second[r] = [x / pivot for x in second[r]]
+                if sink:
+                    sink.emit(Step('divide', (r,), pivot))
+            for i in sorted(col_rows[c]):
+                next_row = rows[i]
+                factor = next_row[c]
+                left = []
+                for j, x in pivot_row.items():
+                    new_x = next_row.get(j, 0) - factor * x
+                    if j == c or new_x == 0:
+                        next_row.pop(j, None)
+                        col_rows[j].discard(i)
+                    else:
+                        next_row[j] = new_x
+                        col_rows[j].add(i)
+                        left.append((j, new_x))
+                right = ()
+                if second is not None:
+                    second[i] = [x - factor * y
+                                 for x, y in zip(second[i], second[r])]
+                    right = tuple((j, x) for j, (x, y)
+                                  in enumerate(zip(second[i], second[r]))
+                                  if y != 0)
+                if sink:
+                    sink.emit(Step('sparse_add', (r, i), -factor,
+                                   values=(tuple(left), right)))
+        return pivots, rows
 
-        return Matrix(second)
+    @property
+    def det(self):
+        """
+        Fraction: Determinant of the matrix, calculated with
+        sparse Gauss elimination. float for float matrix.
+        """
+        if self.shape[0] != self.shape[1]:
+            raise ValueError('Matrix must be square to get determinant,'
+                             ' but given matrix is {}*{}'
+                             .format(*self.shape))
+        pivots, _ = self._eliminate()
+        if len(pivots) < self.shape[0]:
+            return _CONVERTERS[self.dtype](0)
+        to_return = 1
+        perm = {}
+        for r, c, pivot in pivots:
+            to_return *= pivot
+            perm[r] = c
+        visited = set()
+        for start in perm:
+            length = 0
+            while start not in visited:
+                visited.add(start)
+                start = perm[start]
+                length += 1
+            if length % 2 == 0 and length:
+                to_return = -to_return
+        if self.dtype == 'int':
+            return int(to_return)
+        return to_return
 
-    def inv_using_det(self, step_by_step: bool = False) -> 'Matrix':
+    def gauss_elim(self, second: Optional[list] = None,
+                   step_by_step: bool = False,
+                   trace: Optional[TraceSink] = None) -> Matrix:
         """
-        Get inverse matrix using determinent.
+        Calculate with sparse Gauss elimination. See `_eliminate`.
 
         Parameters
         ----------
+        second
+            Right-side matrix. can be 1D or 2D, dense or sparse.
+            If not given, this method calculates inverse matrix.
         step_by_step
-            If True, print step by step solution
+            If true, print step by step solution.
+            Only nonzero elements changed on each step are printed.
+        trace
+            If given, step by step solution is sent to it
+            instead of being printed.
 
         Raises
         ------
-        ZeroDivisionError
-            If there is no inverse matrix.
         ValueError
-            If matrix is not square.
+            If self is not square matrix, or length is different.
+        ZeroDivisionError
+            If determinant of self is zero.
 
         Returns
         -------
         Matrix
-            calculated inverse matrix
+            Dense result of gauss elimination, like `Matrix.gauss_elim`.
 
         Examples
         --------
-        Example of using inv_using_det:
+        >>> a = SparseMatrix.from_matrix([[0,2,0],[1,0,0],[0,0,4]])
+        >>> print(a.gauss_elim([4, 3, 8], step_by_step=True))
+        Pivot at row 1 column 2 : 2
+        Divide row 1 by 2
+        Pivot at row 2 column 1 : 1
+        Pivot at row 3 column 3 : 4
+        Divide row 3 by 4
+        [[3]
+         [2]
+         [2]]
+        """
+        size = self.shape[0]
+        if size != self.shape[1]:
+            raise ValueError('Matrix must be square to use gauss_elim,'
+                             ' but given matrix is {}*{}'.format(*self.shape))
+        dtype = 'float' if self.dtype == 'float' else 'fraction'
+        convert = _CONVERTERS[dtype]
+        if second is None:
+            second = Matrix.unit_mat(size, dtype)
+        elif not isinstance(second, SparseMatrix):
+            second = second if isinstance(second, Matrix) else Matrix(second)
+            if second.ndim == 1:
+                second = second.T
+        if len(second) != size:
+            raise ValueError(
+                'Length of argument is {}, while length of given matrix is {}'
+                .format(len(second), size))
+        second = [[convert(x) for x in next_row] for next_row in second]
+        sink = _trace_sink(step_by_step, trace)
+        pivots, rows = self._eliminate(second, sink)
+        if len(pivots) < size:
+            raise ZeroDivisionError("Error : Attempt to divide with 0.")
+        pivot_rows = {c: r for r, c, _ in pivots}
+        for r, c, _ in reversed(pivots):
+            for j, x in rows[r].items():
+                if j == c:
+                    continue
+                src = pivot_rows[j]
+                second[r] = [y - x * z for y, z in zip(second[r],
+                                                       second[src])]
+                if sink:
+                    sink.emit(Step('sparse_add', (src, r), -x, values=(
+                        (), tuple((k, y) for k, (y, z)
+                                  in enumerate(zip(second[r], second[src]))
+                                  if z != 0))))
+        return Matrix._from_trusted([second[pivot_rows[c]]
+                                     for c in range(size)], dtype,
+                                    (size, len(second[0])))
 
-        >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
-        >>> print(a.inv_using_det())
-        [[-40 16  9]
-         [ 13 -5 -3]
-         [  5 -2 -1]]
 
-        Example of using step by step solution:
+_MAPPED_HEADER = struct.Struct('<4sBc2xqqq')
+_MAPPED_MAGIC = b'MTRX'
 
-        >>> a.inv_using_det(step_by_step=True) #doctest:+ELLIPSIS
-        Get adjugate matrix before transpose
-        [[ 40 -13 -5]
-         [-16   5  2]
-         [ -9   3  1]]
-        Transpose it
-        ...
 
-        """
+def _close_mapped(views, mapped, file, path: Optional[str]) -> None:
+    for view in views:
+        view.release()
+    mapped.close()
+    file.close()
+    if path is not None:
+        os.remove(path)
 
-        if len(self) != len(self[0]):
-            raise ValueError(
-                'Matrix must be square to get inverse, '
-                'but given matrix is {}*{}'
-                .format(len(self), len(self[0])))
-        dest = Matrix(self[:])
-        to_return = Matrix()
-        for i, next_row in enumerate(dest):
-            to_return.append([])
-            for j, _ in enumerate(next_row):
-                to_return[i].append(dest.get_cofactor(i, j).det *
-                                    ((-1)**(i + j)))
-        if step_by_step:
-            print("Get adjugate matrix before transpose")
-            print(Matrix(to_return))
-        to_return = to_return.T
-        if step_by_step:
-            print("Transpose it")
-            print(Matrix(to_return))
-        det_dest = dest.det
-        if step_by_step:
-            print("Get determinant of given matrix")
-            dest.det_step_by_step()
-            print("Divide")
+
+class MappedMatrix:
+    """
+    2D matrix kept in memory-mapped binary file, read by blocks of rows.
+    File has small header, then elements in row-major order,
+    as int64 numerators with one common denominator, or as float64.
+
+    Multiply and Gauss elimination stream blocks of `block_rows` rows,
+    so only a few blocks are in memory at once.
+    Rows can be read like `Matrix`, so `Matrix(mapped)` loads all of it.
+
+    Parameters
+    ----------
+    path
+        File made by `create` or `from_matrix`.
+    writable
+        If True, file is opened for writing.
+    block_rows
+        Number of rows in one block. If not given, class attribute is used.
+
+    Attributes
+    ----------
+    block_rows
+        Default number of rows in one block.
+
+    Examples
+    --------
+    >>> a = MappedMatrix.from_matrix([[1,2,3],[2,5,3],[1,0,8]],
+    ...                              block_rows=2)
+    >>> a.shape
+    (3, 3)
+    >>> print(a @ a.T)
+    [[14 21 25]
+     [21 38 26]
+     [25 26 65]]
+    >>> print(a.gauss_elim([5, 2, 1]))
+    [[-159]
+     [  52]
+     [  20]]
+    """
+    block_rows = 1024
+
+    def __init__(self, path: str, writable: bool = False,
+                 block_rows: Optional[int] = None):
+        file = open(path, 'r+b' if writable else 'rb')
         try:
-            to_return = [[x / det_dest for x in k] for k in to_return]
-            if step_by_step:
-                print(Matrix(to_return))
-            return Matrix(to_return)
-        except ZeroDivisionError as e:
-            err_str = e.args[0]
-            a, _ = err_str.split(", ")
-            a = a[9:]
-            raise ZeroDivisionError("Error : Attempt to divide " + a +
-                                    " with 0.")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE
+                               if writable else mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            file.close()
+            raise ValueError('{} is not a matrix file'.format(path))
+        try:
+            magic, _, typecode, rows, cols, denominator =\
+                _MAPPED_HEADER.unpack_from(mapped)
+        except struct.error:
+            magic = None
+        if magic != _MAPPED_MAGIC or typecode not in (b'q', b'd')\
+                or len(mapped) != _MAPPED_HEADER.size + 8 * rows * cols:
+            mapped.close()
+            file.close()
+            raise ValueError('{} is not a matrix file'.format(path))
+        self.path = path
+        self.typecode = typecode.decode()
+        self.denominator = denominator
+        self.shape = (rows, cols)
+        self.transposed = False
+        if block_rows is not None:
+            self.block_rows = block_rows
+        whole = memoryview(mapped)
+        self._data = whole[_MAPPED_HEADER.size:].cast(self.typecode)
+        self._finalizer = weakref.finalize(
+            self, _close_mapped, (self._data, whole), mapped, file, None)
+
+    @classmethod
+    def create(cls, path: Optional[str], shape: Tuple[int, int],
+               typecode: str = 'q', denominator: int = 1,
+               block_rows: Optional[int] = None) -> 'MappedMatrix':
+        """
+        Make file of zero matrix, and open it for writing.
+
+        Parameters
+        ----------
+        path
+            Path of new file. If None, temporary file is used,
+            and it is removed when the matrix is closed.
+        shape
+            Number of rows and columns.
+        typecode
+            'q' for int64 numerators, 'd' for float64.
+        denominator
+            Common denominator of int64 numerators.
+        block_rows
+            Number of rows in one block.
 
-    def cramer(self, vals: Tuple[Union[int, float, Fraction], ...],
-               step_by_step: bool = False) -> Tuple[Fraction, ...]:
+        Returns
+        -------
+        MappedMatrix
+            Writable zero matrix.
         """
-        Calculate polinomial linear expression using Cramer's formular.
+        if not -1 << 63 <= denominator < 1 << 63:
+            raise OverflowError('Denominator {} does not fit in int64'
+                                .format(denominator))
+        temporary = path is None
+        if temporary:
+            handle, path = tempfile.mkstemp(suffix='.mtrx')
+            os.close(handle)
+        with open(path, 'wb') as f:
+            f.write(_MAPPED_HEADER.pack(_MAPPED_MAGIC, 1, typecode.encode(),
+                                        shape[0], shape[1], denominator))
+            f.truncate(_MAPPED_HEADER.size + 8 * shape[0] * shape[1])
+        to_return = cls(path, True, block_rows)
+        if temporary:
+            _, _, args, _ = to_return._finalizer.detach()
+            to_return._finalizer = weakref.finalize(
+                to_return, _close_mapped, *args[:-1], path)
+        return to_return
+
+    @classmethod
+    def from_matrix(cls, mat: list, path: Optional[str] = None,
+                    block_rows: Optional[int] = None) -> 'MappedMatrix':
+        """
+        Write 2D matrix into new file.
 
         Parameters
         ----------
-        vals
-            Right-sided value to calculate.
-        step_by_step
-            If true, print step by step solution.
+        mat
+            2D Matrix or nested list.
+        path
+            Path of new file. If None, temporary file is used.
+        block_rows
+            Number of rows in one block.
 
         Raises
         ------
-        ZeroDivisionError
-            If polinomial linear expression cannot be solved.
         ValueError
-            If matrix is not square.
+            If matrix is not 2D.
+        OverflowError
+            If numerators or denominator do not fit in int64.
 
         Returns
         -------
-        tuple
-           Roots calculated. Type is Fraction.
+        MappedMatrix
+            Matrix in the file.
+        """
+        if isinstance(mat, MappedMatrix):
+            mat = mat.to_matrix()
+        else:
+            mat = Matrix(mat, getattr(mat, 'dtype', 'fraction'))
+        if mat.ndim != 2:
+            raise ValueError('Mapped matrix must be 2D, but {}D matrix given'
+                             .format(mat.ndim))
+        if mat.dtype in ('float', 'int'):
+            typecode, denominator = 'd' if mat.dtype == 'float' else 'q', 1
+        else:
+            typecode = 'q'
+            denominator = lcm(*[Fraction(x).denominator
+                                for next_row in mat for x in next_row])
+        to_return = cls.create(path, mat.shape, typecode, denominator,
+                               block_rows)
+        for i, next_row in enumerate(mat):
+            if mat.dtype == 'fraction':
+                next_row = [x.numerator * (denominator // x.denominator)
+                            for x in next_row]
+            to_return._write_row(i, next_row)
+        return to_return
 
-        Examples
-        --------
-        Example of using cramer:
+    def close(self) -> None:
+        """
+        Close the file. Temporary file is removed.
+        """
+        self._finalizer()
 
-        >>> a = Matrix([[1,2,3],[2,5,3],[1,0,8]])
-        >>> res = a.cramer((5, 2, 1))
-        >>> print(tuple(int(x) for x in res))
-        (-159, 52, 20)
+    def __enter__(self):
+        return self
 
-        Example of using cramer with step by step solution:
+    def __exit__(self, *args):
+        self.close()
 
-        >>> a.cramer((5, 2, 1), step_by_step=True) #doctest:+ELLIPSIS
-        Find Determinant of given matrix.
-        Determinant of
-        [[1 2 3]
-         [2 5 3]
-         [1 0 8]]
-        is 40 - 26 + -15 = -1
-        ...
+    def _write_row(self, index: int, values: list) -> None:
+        cols = self.shape[1]
+        try:
+            self._data[index * cols:(index + 1) * cols] =\
+                array(self.typecode, values)
+        except OverflowError:
+            raise OverflowError('Elements of row {} do not fit in int64'
+                                .format(index))
 
+    @property
+    def dtype(self) -> str:
         """
+        str: 'float' for float64 file, 'int' for int64 file without
+        denominator, else 'fraction'.
+        """
+        if self.typecode == 'd':
+            return 'float'
+        return 'int' if self.denominator == 1 else 'fraction'
 
-        if not len(self) == len(self[0]) == len(vals):
-            raise ValueError(
-                'Matrix must be square and have same size as numbers'
-                " to use Cramer's formular,"
-                ' but {}*{} matrix given with {} numbers.'
-                .format(len(self), len(self[0]), len(vals)))
+    @property
+    def ndim(self) -> int:
+        """
+        int: Number of dimensions, which is always 2.
+        """
+        return 2
 
-        if isinstance(vals, list):
-            vals = tuple(vals)
-        to_return = tuple()
-        mat_det = self.det
-        if step_by_step:
-            print("Find Determinant of given matrix.")
-            self.det_step_by_step()
-        for i in range(len(self[0])):
-            next_mat = Matrix(self[:])
-            for j in range(len(self)):
-                next_mat[j][i] = vals[j]
-            if step_by_step:
-                print("Find for variable", i + 1)
-                next_mat.det_step_by_step()
-            try:
-                if step_by_step:
-                    print("Divide", next_mat.det, "with", mat_det, ":",
-                          next_mat.det / mat_det)
-                to_return += (next_mat.det / mat_det,)
-            except ZeroDivisionError as e:
-                err_str = e.args[0]
-                a, _ = err_str.split(", ")
-                a = a[9:]
-                raise ZeroDivisionError("Error : Attempt to divide " + a +
-                                        " with 0.")
+    def _raw_row(self, index: int) -> list:
+        rows, cols = self.shape
+        if not -rows <= index < rows:
+            raise IndexError('Index {} is out of range for shape {}'
+                             .format(index, self.shape))
+        index %= rows
+        if self.transposed:
+            return self._data[index::rows].tolist()
+        return self._data[index * cols:(index + 1) * cols].tolist()
 
-        return to_return
+    def _convert(self, values: list) -> list:
+        if self.denominator == 1:
+            return values
+        return [Fraction(x, self.denominator) for x in values]
 
-    def get_cofactor(self, i_selected: int, j_selected: int) -> 'Matrix':
-        """
-        Get cofactor with given index. Index starts with 0.
+    def __len__(self):
+        return self.shape[0]
 
-        Parameters
-        ----------
-        i_selected
-            Row index to get cofactor.
-        j_selected
-            Colomn index to get coffactor.
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            return self[index[0]][index[1]]
+        return self._convert(self._raw_row(index))
 
-        Returns
-        -------
-        Matrix
-            Cofactor calculated.
-        """
-        to_return = self[:]
-        del to_return[i_selected]
-        for i, next_row in enumerate(to_return):
-            to_return[i] = [next_elem for j, next_elem in enumerate(next_row)
-                            if j != j_selected]
-        return Matrix(to_return)
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
 
-    def mat_input(self) -> None:
+    def blocks(self) -> Iterator[List[list]]:
         """
-        User input for matrix.
+        Iterate over blocks of `block_rows` rows.
+        """
+        for start in range(0, len(self), self.block_rows):
+            yield [self[i] for i in
+                   range(start, min(start + self.block_rows, len(self)))]
 
-        Raises
-        ------
-        ValueError
-            Raise if unappropriate value is given.
+    def to_matrix(self) -> Matrix:
         """
-        print("Input matrix. press enter key two time for exit."
-              "\nElement is seperated with space.")
-        while True:
-            inputed = input().split(" ")
-            if inputed != [""]:
-                try:
-                    self.append([Fraction(x) for x in inputed])
-                except ValueError as e:
-                    err_str = e.args[0]
-                    raise ValueError(err_str[30:] + " is not a number.")
-            else:
-                break
+        Load whole matrix into memory.
+        """
+        return Matrix._from_trusted(list(self), self.dtype, self.shape)
 
-    def det_step_by_step(self) -> Fraction:
+    def tolist(self) -> List[list]:
         """
-        Calculate determinant with printing step by step solution.
+        Get elements as nested list.
+        """
+        return list(self)
 
-        Raises
-        ------
-        ValueError
-            If matrix is not square.
+    def __eq__(self, other):
+        if isinstance(other, (MappedMatrix, list)):
+            return self.shape == (len(other), len(other[0]) if len(other)
+                                  else 0) and\
+                all(x == y for x, y in zip(self, other))
+        return NotImplemented
 
-        Returns
-        -------
-        Fraction
-            calculated determinant.
-        """
-        if len(self) != len(self[0]):
-            raise ValueError('Matrix must be square to get determinant,'
-                             ' but given matrix is {}*{}'
-                             .format(len(self), len(self[0])))
-        if len(self) == 1:
-            return self[0][0]
-        if len(self) == 2:
-            print("Determinant of")
-            print(self)
-            print("is", end=' ')
-            print(self[0][0] * self[1][1] - self[0][1] * self[1][0])
-            return self[0][0] * self[1][1] - self[0][1] * self[1][0]
+    def __str__(self):
+        return str(self.to_matrix())
 
-        to_return = 0
-        print("Determinant of")
-        print(self)
-        print("is", end=' ')
-        for i in range(len(self)):
-            if i == len(self) - 1:
-                print(self[0][i] * self.get_cofactor(0, i).det *
-                      ((-1)**i), end=' ')
-            elif i % 2 == 0:
-                print(self[0][i] * self.get_cofactor(0, i).det,
-                      '-', end=' ')
-            else:
-                print(self[0][i] * self.get_cofactor(0, i).det,
-                      '+', end=' ')
-            to_return += self[0][i] * self.get_cofactor(0, i).det *\
-                ((-1)**i)
-        print('=', to_return)
+    def __repr__(self):
+        return 'MappedMatrix({!r}, shape={})'.format(self.path, self.shape)
+
+    @property
+    def T(self) -> 'MappedMatrix':
+        """
+        MappedMatrix: Transposed view of same file.
+        """
+        to_return = object.__new__(MappedMatrix)
+        to_return.path = self.path
+        to_return.typecode = self.typecode
+        to_return.denominator = self.denominator
+        to_return.shape = (self.shape[1], self.shape[0])
+        to_return.transposed = not self.transposed
+        to_return.block_rows = self.block_rows
+        to_return._data = self._data
+        to_return._finalizer = self._finalizer
+        to_return._base = self
         return to_return
 
-    @classmethod
-    def mul_stepbystep(cls, first: 'Matrix', second: 'Matrix') -> 'Matrix':
+    def __matmul__(self, other):
         """
-        Multiply matrix with printing step by step solution.
-        Calculates `first @ second`.
+        __matmul__ method for `@`. See `matmul`.
+        """
+        return self.matmul(other)
+
+    def __rmatmul__(self, other):
+        return MappedMatrix.from_matrix(other, block_rows=self.block_rows)\
+            .matmul(self)
+
+    def matmul(self, other, path: Optional[str] = None) -> 'MappedMatrix':
+        """
+        Multiply with 2D matrix, streaming blocks of rows of both.
+        Numerators are multiplied as int, and result has product of
+        denominators as its denominator.
 
         Parameters
         ----------
-        first
-            Matrix to calculate with.
-        second
-            Matrix to calculate with.
+        other
+            MappedMatrix, Matrix, or nested list.
+        path
+            Path of file for result. If None, temporary file is used.
 
         Raises
         ------
         ValueError
-            If matrixes cannot be multiplied.
+            If matrix multiply is unsupported.
+        OverflowError
+            If numerators or denominator of result do not fit in int64.
 
         Returns
         -------
-        Matrix
-            Calculated matrix.
+        MappedMatrix
+            Result in new file.
         """
-        if len(first[0]) != len(second):
+        if not isinstance(other, (MappedMatrix, list)):
+            raise ValueError("Attempt to multiply matrix with {}"
+                             .format(type(other).__name__))
+        if not isinstance(other, MappedMatrix):
+            other = MappedMatrix.from_matrix(other,
+                                             block_rows=self.block_rows)
+        if self.shape[1] != other.shape[0]:
             raise ValueError(
                 'Attempt to multiply {}*{} matrix with {}*{} matrix'
-                .format(len(first), len(first[0]),
-                        len(second), len(second[0])))
-        to_return = []
-        for i, row_first in enumerate(first):
-            to_return.append([])
-            for j in range(len(second[0])):
-                to_return[i].append(0)
-                for k in range(len(first[0])):
-                    print(row_first[k], "X", second[k][j], sep='', end='')
-                    to_return[i][j] += row_first[k] * second[k][j]
-                    if k < len(first[0]) - 1:
-                        print("+", sep='', end='')
-                if j < len(second[0]) - 1:
-                    print(", ", end='')
-            print()
-        return Matrix(to_return)
+                .format(*self.shape, *other.shape))
+        is_float = 'd' in (self.typecode, other.typecode)
+        to_return = MappedMatrix.create(
+            path, (self.shape[0], other.shape[1]), 'd' if is_float else 'q',
+            1 if is_float else self.denominator * other.denominator,
+            self.block_rows)
+        dtype = 'float' if is_float else 'int'
+        scale = 1 / (self.denominator * other.denominator) if is_float else 1
+        step = self.block_rows
+        for start in range(0, self.shape[0], step):
+            a_block = [self._raw_row(i) for i in
+                       range(start, min(start + step, self.shape[0]))]
+            results = [[0] * other.shape[1] for _ in a_block]
+            for inner in range(0, other.shape[0], other.block_rows):
+                stop = min(inner + other.block_rows, other.shape[0])
+                b_block = [other._raw_row(k) for k in range(inner, stop)]
+                part = _matmul_rows([x[inner:stop] for x in a_block],
+                                    b_block, dtype, Matrix.block_size, None)
+                results = _elementwise(add, results, part)
+            for i, next_row in enumerate(results, start):
+                if scale != 1:
+                    next_row = [x * scale for x in next_row]
+                to_return._write_row(i, next_row)
+        return to_return
 
-    @classmethod
-    def unit_mat(cls, size: int) -> 'Matrix':
+    def gauss_elim(self, second: Optional[list] = None,
+                   step_by_step: bool = False,
+                   trace: Optional[TraceSink] = None) -> Matrix:
         """
-        Get unit matrix of given size.
+        Gauss-Jordan elimination streaming blocks of rows.
+        Rows being eliminated are kept in scratch files, block by block,
+        so at most two blocks of rows are in memory.
+        Each row is reduced by all rows before it, and then
+        by all rows after it.
+        Exact row has its first nonzero element as its pivot.
+        Exact rows are kept as int, and divided by gcd of the row
+        after every reduction.
+        Float pivot is the largest absolute value in remaining rows of
+        the block and columns without pivot, and its row is swapped
+        into place.
 
         Parameters
         ----------
-        size
-            Size of unit matrix.
+        second
+            Right-side matrix. can be 1D or 2D.
+            If not given, this method calculates inverse matrix.
+        step_by_step
+            If true, print step by step solution, without matrix states.
+        trace
+            If given, step by step solution is sent to it
+            instead of being printed.
+
+        Raises
+        ------
+        ValueError
+            If self is not square matrix, or length is different.
+        ZeroDivisionError
+            If determinant of self is zero.
 
         Returns
         -------
         Matrix
-            Calculated unit matrix.
+            Result of gauss elimination, like `Matrix.gauss_elim`.
         """
-        to_return = []
-        for i in range(size):
-            to_return.append([])
-            for j in range(size):
-                if i == j:
-                    to_return[i].append(1)
+        size = self.shape[0]
+        if size != self.shape[1]:
+            raise ValueError('Matrix must be square to use gauss_elim,'
+                             ' but given matrix is {}*{}'.format(*self.shape))
+        if second is None:
+            width = size
+
+            def right_row(i):
+                return [int(i == j) for j in range(size)]
+        else:
+            if len(second) != size:
+                raise ValueError(
+                    'Length of argument is {}, while length of given'
+                    ' matrix is {}'.format(len(second), size))
+            is_1d = not isinstance(second[0], list)
+            width = 1 if is_1d else len(second[0])
+
+            def right_row(i):
+                return [second[i]] if is_1d else list(second[i])
+        exact = self.typecode == 'q'
+        sink = _trace_sink(step_by_step, trace)
+        step = self.block_rows
+        starts = range(0, size, step)
+        pivot_cols = []
+        free_cols = list(range(size))
+        # Exact row i is kept as int row, which is row of the
+        # Gauss-Jordan elimination multiplied by scales[i].
+        scales = [1] * size
+
+        def first_row(i):
+            if not exact:
+                return [float(x) for x in self[i] + right_row(i)]
+            rows, row_scales = _scale_rows([self._raw_row(i) + [
+                x * self.denominator for x in right_row(i)]])
+            scales[i] = row_scales[0] * self.denominator
+            return rows[0]
+
+        def reduce(block, block_start, done, done_start):
+            for j, done_row in enumerate(done, done_start):
+                c = pivot_cols[j]
+                pivot = done_row[c]
+                for i, next_row in enumerate(block, block_start):
+                    factor = next_row[c]
+                    if factor == 0 or i == j:
+                        continue
+                    if not exact:
+                        next_row[:] = [x - factor * y
+                                       for x, y in zip(next_row, done_row)]
+                        if sink:
+                            sink.emit(Step('add', (j, i), -factor))
+                        continue
+                    next_row[:] = [x * pivot - factor * y
+                                   for x, y in zip(next_row, done_row)]
+                    divisor = gcd(*next_row)
+                    if divisor > 1:
+                        next_row[:] = [x // divisor for x in next_row]
+                    if sink:
+                        sink.emit(Step('add', (j, i), Fraction(
+                            -factor * scales[j], pivot * scales[i])))
+                    scales[i] = Fraction(pivot * scales[i], max(divisor, 1))
+
+        with tempfile.TemporaryDirectory() as scratch:
+            def save(start, block):
+                with open(os.path.join(scratch, str(start)), 'wb') as f:
+                    pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+
+            def load(start):
+                with open(os.path.join(scratch, str(start)), 'rb') as f:
+                    return pickle.load(f)
+
+            for start in starts:
+                block = [first_row(i)
+                         for i in range(start, min(start + step, size))]
+                for done_start in range(0, start, step):
+                    reduce(block, start, load(done_start), done_start)
+                for i in range(start, start + len(block)):
+                    if exact:
+                        next_row = block[i - start]
+                        reduce([next_row], i, block[:i - start], start)
+                        c = next((j for j in range(size)
+                                  if next_row[j] != 0), None)
+                    else:
+                        c, k = max(((j, k) for k in range(i - start,
+                                                          len(block))
+                                    for j in free_cols),
+                                   key=lambda x: abs(block[x[1]][x[0]]))
+                        if block[k][c] == 0:
+                            c = None
+                        elif k != i - start:
+                            block[i - start], block[k] =\
+                                block[k], block[i - start]
+                            if sink:
+                                sink.emit(Step('swap', (i, start + k)))
+                        next_row = block[i - start]
+                    if c is None:
+                        raise ZeroDivisionError(
+                            "Error : Attempt to divide with 0.")
+                    pivot_cols.append(c)
+                    free_cols.remove(c)
+                    if exact:
+                        continue
+                    pivot = next_row[c]
+                    if pivot != 1:
+                        next_row[:] = [x / pivot for x in next_row]
+                        if sink:
+                            sink.emit(Step('divide', (i,), pivot))
+                    reduce(block[i - start + 1:], i + 1, [next_row], i)
+                save(start, block)
+
+            to_return = [None] * size
+            for start in reversed(starts):
+                block = load(start)
+                for done_start in range(start + step, size, step):
+                    reduce(block, start, load(done_start), done_start)
+                for i in range(len(block) - 1, -1, -1):
+                    reduce(block[:i], start, [block[i]], start + i)
+                save(start, block)
+                for i, next_row in enumerate(block, start):
+                    pivot = next_row[pivot_cols[i]]
+                    if not exact:
+                        to_return[pivot_cols[i]] = next_row[size:]
+                        continue
+                    to_return[pivot_cols[i]] = [Fraction(x, pivot)
+                                                for x in next_row[size:]]
+                    if sink and pivot != scales[i]:
+                        sink.emit(Step('divide', (i,),
+                                       Fraction(pivot, scales[i])))
+                        scales[i] = pivot
+        dtype = 'fraction' if exact else 'float'
+        return Matrix._from_trusted(to_return, dtype, (size, width))
+
+
+JOB_OPERATIONS = ('matmul', 'det', 'gauss', 'inverse', 'cramer')
+
+
+def _job_matrix(job: dict, key: str) -> Matrix:
+    """
+    Get matrix `key` of job. It can be nested list, or path of file
+    saved by `Matrix.save`, CSV file, or text file read by `from_text`.
+    """
+    value = job.get(key)
+    if value is None:
+        raise ValueError('Job has no matrix {!r}'.format(key))
+    dtype = job.get('dtype', 'fraction')
+    if not isinstance(value, str):
+        return Matrix(value, dtype)
+    with open(value, 'rb') as f:
+        is_binary = f.read(len(_MATRIX_MAGIC)) == _MATRIX_MAGIC
+    if is_binary:
+        mat = Matrix.load(value)
+        return mat if mat.dtype == dtype else mat.astype(dtype)
+    if value.endswith('.csv'):
+        return Matrix.from_csv(value, dtype)
+    with open(value) as f:
+        return Matrix.from_text(f, dtype)
+
+
+def _run_job(job: dict) -> dict:
+    """
+    Run one job, and get record of its result.
+    """
+    record = {'id': job.get('id'), 'op': job.get('op')}
+    op = job.get('op')
+    method = job.get('method')
+    sink = ListSink() if job.get('trace') else None
+    start = time.perf_counter()
+    try:
+        if 'error' in job:
+            raise ValueError(job['error'])
+        if op not in JOB_OPERATIONS:
+            raise ValueError('Unknown operation : {}'.format(op))
+        a = _job_matrix(job, 'a')
+        if op == 'matmul':
+            b = _job_matrix(job, 'b')
+            result = Matrix.mul_stepbystep(a, b, trace=sink) if sink\
+                else a @ b
+        elif op == 'det':
+            result = a.det_step_by_step(trace=sink) if sink\
+                else a.determinant(method or 'bareiss')
+        elif op == 'gauss':
+            result = a.gauss_elim(_job_matrix(job, 'b'), trace=sink)
+        elif op == 'inverse':
+            result = a.inv_using_det(trace=sink) if method == 'det'\
+                else a.gauss_elim(trace=sink)
+        else:
+            b = _job_matrix(job, 'b')
+            result = a.cramer(tuple(b) if b.ndim == 1 else tuple(b.T[0]),
+                              trace=sink)
+    except Exception as e:
+        # Any failure, even IndexError of empty matrix, is only
+        # recorded, so one bad job does not stop the run
+        record.update(status='error', error=str(e))
+    else:
+        record.update(status='ok', result=_to_json(result))
+    record['seconds'] = time.perf_counter() - start
+    if sink:
+        record['trace'] = [_step_record(x) for x in sink.steps]
+    return record
+
+
+def _batch_worker(conn) -> None:
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        conn.send(_run_job(job))
+
+
+class _BatchWorker:
+    """
+    Process running jobs sent through pipe, one at a time.
+    """
+    __slots__ = ('process', 'conn', 'job', 'index', 'deadline')
+
+    def __init__(self):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_batch_worker,
+                                               args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def start_job(self, job: dict, index: int,
+                  timeout: Optional[float]) -> None:
+        self.conn.send(job)
+        self.job = job
+        self.index = index
+        self.deadline = None if timeout is None\
+            else time.monotonic() + timeout
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def run_batch(jobs: Iterable[dict], workers: int = 1,
+              timeout: Optional[float] = None) -> Iterator[dict]:
+    """
+    Run jobs, and iterate over records of results in order of jobs.
+
+    Job is dict with 'op', which is one of `JOB_OPERATIONS`,
+    matrix 'a', and matrix 'b' for 'matmul', 'gauss' and 'cramer'.
+    Matrix is nested list, or path of file. Optional keys are
+    'id', 'dtype', 'method' for 'det' and 'inverse',
+    and 'trace', which adds steps of step by step solution to record.
+
+    Parameters
+    ----------
+    jobs
+        Jobs to run.
+    workers
+        Number of worker processes.
+    timeout
+        Seconds each job can run. Process running job longer than it
+        is killed, and job gets 'timeout' status.
+
+    Returns
+    -------
+    Iterator[dict]
+        Records with 'id', 'op', 'status', which is 'ok', 'error' or
+        'timeout', 'seconds', and 'result' or 'error'.
+
+    Examples
+    --------
+    >>> jobs = [{'op': 'det', 'a': [[1, 2], [3, 4]]},
+    ...         {'op': 'inverse', 'a': [[1, 2], [2, 4]]}]
+    >>> for record in run_batch(jobs):
+    ...     print(record['status'], record.get('result', record.get('error')))
+    ok -2
+    error Error : Attempt to divide 0 with 0.
+    """
+    if workers == 1 and timeout is None:
+        for job in jobs:
+            yield _run_job(job)
+        return
+    jobs = iter(jobs)
+    idle = []
+    busy = {}
+    done = {}
+    submitted = yielded = 0
+    try:
+        while True:
+            while len(busy) < workers:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                worker = idle.pop() if idle else _BatchWorker()
+                worker.start_job(job, submitted, timeout)
+                busy[worker.conn] = worker
+                submitted += 1
+            if not busy:
+                break
+            wait_for = None
+            if timeout is not None:
+                wait_for = max(0, min(x.deadline for x in busy.values())
+                               - time.monotonic())
+            for conn in multiprocessing.connection.wait(list(busy),
+                                                        wait_for):
+                worker = busy.pop(conn)
+                try:
+                    done[worker.index] = conn.recv()
+                except EOFError:
+                    worker.kill()
+                    done[worker.index] = {
+                        'id': worker.job.get('id'),
+                        'op': worker.job.get('op'), 'status': 'error',
+                        'error': 'Worker exited with code {}'
+                                 .format(worker.process.exitcode),
+                        'seconds': None}
                 else:
-                    to_return[i].append(0)
-        return Matrix(to_return)
+                    idle.append(worker)
+            now = time.monotonic()
+            for conn, worker in list(busy.items()):
+                if timeout is not None and worker.deadline <= now:
+                    del busy[conn]
+                    worker.kill()
+                    done[worker.index] = {
+                        'id': worker.job.get('id'),
+                        'op': worker.job.get('op'), 'status': 'timeout',
+                        'error': 'Job did not finish in {} seconds'
+                                 .format(timeout),
+                        'seconds': timeout}
+            while yielded in done:
+                yield done.pop(yielded)
+                yielded += 1
+    finally:
+        for worker in idle:
+            worker.stop()
+        for worker in busy.values():
+            worker.kill()
 
-    @property
-    def det(self) -> Fraction:
-        """
-        Fraction: Determinant of the matrix.
-        """
-        if len(self) != len(self[0]):
-            raise ValueError(
-                'Matrix must be square to get determinant,'
-                ' but given matrix is {}*{}'
-                .format(len(self), len(self[0])))
-        if len(self) == 1:
-            return self[0][0]
-        if len(self) == 2:
-            return self[0][0] * self[1][1] - self[0][1] * self[1][0]
 
-        to_return = 0
-        for i in range(len(self)):
-            to_return += self[0][i] * self.get_cofactor(0, i).det *\
-                ((-1)**i)
-        return to_return
+def _read_jobs(sources: List[str], trace: bool = False) -> Iterator[dict]:
+    """
+    Read jobs from JSONL files, '-' for stdin, or directories of
+    JSON files, each of which has one job.
+    Path of matrix in job is relative to the file of the job.
+    Line or file which is not JSON object is given as job with only
+    'id' and 'error', which is recorded as error by `_run_job`.
+    """
+    def prepare(job, default_id, base):
+        if not isinstance(job, dict):
+            return {'id': default_id, 'error': 'Job must be JSON object'}
+        job.setdefault('id', default_id)
+        if trace:
+            job.setdefault('trace', True)
+        for key in ('a', 'b'):
+            if isinstance(job.get(key), str):
+                job[key] = os.path.join(base, job[key])
+        return job
 
-    @property
-    def T(self) -> 'Matrix':
-        """
-        Matrix: Transposed matrix.
-        """
-        if not isinstance(self[0], list):
-            return Matrix([[x] for x in self])
-        return Matrix([[temp[i] for temp in self]
-                       for i in range(len(self[0]))])
+    for source in sources:
+        if os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.endswith('.json'):
+                    with open(os.path.join(source, name)) as f:
+                        try:
+                            job = json.load(f)
+                        except ValueError as e:
+                            job = {'id': name, 'error': str(e)}
+                    yield prepare(job, name, source)
+            continue
+        f = sys.stdin if source == '-' else open(source)
+        base = '' if source == '-' else os.path.dirname(source)
+        try:
+            for line_no, next_line in enumerate(f, 1):
+                if not next_line.strip():
+                    continue
+                job_id = '{}:{}'.format(source, line_no)
+                try:
+                    job = json.loads(next_line)
+                except ValueError as e:
+                    job = {'id': job_id, 'error': str(e)}
+                yield prepare(job, job_id, base)
+        finally:
+            if f is not sys.stdin:
+                f.close()
 
-    @property
-    def shape(self) -> Tuple[int, ...]:
-        """
-        Tuple of int: Shape of the matrix.
-        """
-        if not isinstance(self[0], list):
-            return (len(self),)
-        return (len(self), ) + Matrix(self[0]).shape
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run batch of jobs from command line. See `run_batch`.
+    Records are written as JSON lines, and summary is printed to stderr.
+
+    Returns
+    -------
+    int
+        Exit status. 0 if every job is ok, 1 if any job is not,
+        and 2 if jobs cannot be read.
+    """
+    parser = argparse.ArgumentParser(
+        prog='matrix.py',
+        description="Run batch of matrix jobs. Without arguments, "
+                    "two matrixes are read interactively.")
+    parser.add_argument('sources', nargs='+', metavar='source',
+                        help="JSONL file of jobs, directory of JSON files"
+                        " each with one job, or - for stdin")
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help="number of worker processes")
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help="time limit of each job")
+    parser.add_argument('--trace', action='store_true',
+                        help="add step by step solution to every result")
+    parser.add_argument('--output', metavar='FILE',
+                        help="write results to FILE instead of stdout")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    counts = OrderedDict((x, 0) for x in ('ok', 'error', 'timeout'))
+    job_seconds = []
+    out = open(args.output, 'w') if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        for record in run_batch(_read_jobs(args.sources, args.trace),
+                                args.jobs, args.timeout):
+            out.write(json.dumps(record) + "\n")
+            counts[record['status']] += 1
+            if record['seconds'] is not None:
+                job_seconds.append(record['seconds'])
+    except (OSError, ValueError) as e:
+        print("error :", e, file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print("==Summary==", file=sys.stderr)
+    print("jobs       : {} ({})".format(total, ", ".join(
+        "{} {}".format(x, y) for x, y in counts.items())), file=sys.stderr)
+    print("elapsed    : {:.5f} s".format(elapsed), file=sys.stderr)
+    print("throughput : {:.2f} jobs/s".format(total / elapsed if elapsed
+                                              else 0), file=sys.stderr)
+    if job_seconds:
+        print("job time   : mean {:.5f} s, max {:.5f} s".format(
+            sum(job_seconds) / len(job_seconds), max(job_seconds)),
+            file=sys.stderr)
+    return 0 if counts['ok'] == total else 1
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
     a = Matrix()
     b = Matrix()
     a.mat_input()